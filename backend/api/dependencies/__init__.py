@@ -15,14 +15,16 @@ from .auth import (
     PasswordHandler,
     JWTHandler,
     BruteForceProtection,
-    SessionManager
+    SessionManager,
+    CachedUser,
+    UserCache
 )
 
-from .database import get_db, get_db_session
+from .database import get_db, get_db_session, stream_ndjson
 
 from .rate_limiting import (
-    limiter,
     rate_limit,
+    make_limiter,
     auth_rate_limit,
     api_rate_limit,
     trading_rate_limit,
@@ -40,10 +42,14 @@ from .validation import (
 
 from .logging import (
     audit_logger,
+    audit_batcher,
+    audit_sink,
     request_logger,
     compliance_logger,
     privacy_logger,
     AuditLogger,
+    AuditLogBatcher,
+    JSONLAuditSink,
     RequestLogger,
     ComplianceLogger,
     DataPrivacyLogger
@@ -61,14 +67,17 @@ __all__ = [
     "JWTHandler",
     "BruteForceProtection",
     "SessionManager",
+    "CachedUser",
+    "UserCache",
     
     # Database
     "get_db",
     "get_db_session",
+    "stream_ndjson",
     
     # Rate Limiting
-    "limiter",
     "rate_limit",
+    "make_limiter",
     "auth_rate_limit",
     "api_rate_limit", 
     "trading_rate_limit",
@@ -84,10 +93,14 @@ __all__ = [
     
     # Logging
     "audit_logger",
+    "audit_batcher",
+    "audit_sink",
     "request_logger",
     "compliance_logger",
     "privacy_logger",
     "AuditLogger",
+    "AuditLogBatcher",
+    "JSONLAuditSink",
     "RequestLogger", 
     "ComplianceLogger",
     "DataPrivacyLogger",
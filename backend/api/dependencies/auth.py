@@ -5,22 +5,34 @@ JWT authentication, OAuth2, MFA, and role-based access control.
 """
 
 import asyncio
+import hashlib
+import random
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import jwt
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer
 from passlib.context import CryptContext
 from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHashError
+import orjson
 import redis.asyncio as aioredis
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.orm import load_only
 
 from ..models.database import get_db
+from .database import get_db_session
 from ..models.user import User, UserRole, UserSession
+from ..utils.clock import utcnow_iso
 from ..utils.config import get_settings
+from ..utils.request_meta import get_client_host, get_user_agent
+from .validation import validate_password_strength
 
 
 class TokenData:
@@ -88,21 +100,37 @@ class PasswordHandler:
     
     @staticmethod
     def verify_password(password: str, hashed_password: str) -> bool:
-        """Verify password against hash, try Argon2 first then bcrypt"""
-        try:
-            # Try Argon2 first (check if it starts with $argon2)
-            if hashed_password.startswith("$argon2"):
-                argon2_hasher.verify(hashed_password, password)
-                return True
-            else:
-                # Fall back to bcrypt
-                return pwd_context.verify(password, hashed_password)
-        except (VerifyMismatchError, Exception):
-            # Try bcrypt if Argon2 fails
+        """Verify password against hash, dispatching on the hash format"""
+        if not hashed_password:
+            # Accounts without a local password (e.g. SSO-only) never match
+            return False
+        
+        if hashed_password.startswith("$argon2"):
             try:
-                return pwd_context.verify(password, hashed_password)
-            except Exception:
+                return argon2_hasher.verify(hashed_password, password)
+            except (VerifyMismatchError, VerificationError, InvalidHashError):
                 return False
+        
+        try:
+            return pwd_context.verify(password, hashed_password)
+        except (ValueError, TypeError):
+            # Unrecognized or malformed hash
+            return False
+    
+    @staticmethod
+    async def hash_password_async(password: str, use_argon2: bool = True) -> str:
+        """Hash password in a worker thread so the event loop is not blocked"""
+        return await asyncio.to_thread(PasswordHandler.hash_password, password, use_argon2)
+    
+    @staticmethod
+    async def verify_password_async(password: str, hashed_password: str) -> bool:
+        """Verify password in a worker thread so the event loop is not blocked"""
+        return await asyncio.to_thread(PasswordHandler.verify_password, password, hashed_password)
+    
+    @staticmethod
+    def validate_password_strength(password: str) -> Dict[str, Any]:
+        """Validate password strength against the shared policy"""
+        return validate_password_strength(password)
     
     @staticmethod
     def needs_rehash(hashed_password: str) -> bool:
@@ -113,6 +141,126 @@ class PasswordHandler:
             return pwd_context.identify(hashed_password) == "bcrypt"
 
 
+class FailedPasswordCache:
+    """Short-lived record of recently rejected password attempts.
+
+    Repeating a just-rejected password for the same account is answered
+    without running the KDF again. The stored hash is part of the key, so a
+    password change makes earlier entries unreachable.
+    """
+    
+    def __init__(self, maxsize: int = 10000, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, float]" = OrderedDict()
+    
+    @staticmethod
+    def _key(email: str, password: str, hashed_password: str) -> bytes:
+        material = "\0".join((email.lower(), password, hashed_password))
+        return hashlib.sha256(material.encode()).digest()[:16]
+    
+    def contains(self, email: str, password: str, hashed_password: str) -> bool:
+        """Check whether this exact attempt was rejected within the TTL"""
+        key = self._key(email, password, hashed_password)
+        expires_at = self._entries.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return False
+        return True
+    
+    def add(self, email: str, password: str, hashed_password: str):
+        """Remember a rejected attempt"""
+        key = self._key(email, password, hashed_password)
+        self._entries[key] = time.monotonic() + self.ttl
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all remembered attempts"""
+        self._entries.clear()
+
+
+failed_password_cache = FailedPasswordCache()
+
+
+# Unused SHA-256 state copied for each token digest, cheaper than a fresh constructor.
+# Copies are independent and the prototype is never updated, so sharing is thread-safe.
+_TOKEN_HASHER = hashlib.sha256()
+
+
+def token_digest(token: str) -> bytes:
+    """Truncated SHA-256 digest used to key in-memory token caches"""
+    hasher = _TOKEN_HASHER.copy()
+    hasher.update(token.encode())
+    return hasher.digest()[:16]
+
+
+class TokenVerificationCache:
+    """Bounded LRU cache of verified tokens with per-entry expiry.
+
+    Keys are truncated SHA-256 digests so raw tokens are never held in memory.
+    Entries live for at most ``ttl`` seconds and never beyond the token's own
+    ``exp`` claim. Only successfully verified tokens are stored.
+    """
+    
+    def __init__(self, maxsize: int = 10000, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, TokenData]]" = OrderedDict()
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return token_digest(token)
+    
+    def get(self, token: str) -> Optional[TokenData]:
+        """Return cached token data if present and not expired"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, token_data = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        
+        self._entries.move_to_end(key)
+        return token_data
+    
+    def set(self, token: str, token_data: TokenData):
+        """Cache verified token data until min(ttl, token expiry)"""
+        ttl = self.ttl
+        exp = token_data.payload.get("exp")
+        if exp is not None:
+            ttl = min(ttl, float(exp) - time.time())
+        if ttl <= 0:
+            return
+        
+        key = self._key(token)
+        self._entries[key] = (time.monotonic() + ttl, token_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, token: str):
+        """Remove a token from the cache"""
+        self._entries.pop(self._key(token), None)
+    
+    def clear(self):
+        """Remove all cached tokens"""
+        self._entries.clear()
+
+
+# Verified token cache shared by all JWT consumers in this process
+token_cache = TokenVerificationCache(
+    maxsize=settings.jwt_cache_max_entries,
+    ttl=settings.jwt_cache_ttl
+)
+
+
 class JWTHandler:
     """JWT token creation and validation"""
     
@@ -141,7 +289,11 @@ class JWTHandler:
     
     @staticmethod
     def verify_token(token: str) -> TokenData:
-        """Verify and decode token"""
+        """Verify and decode token, serving repeat verifications from cache"""
+        cached = token_cache.get(token)
+        if cached is not None:
+            return cached
+        
         try:
             payload = jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
             user_id: str = payload.get("sub")
@@ -149,12 +301,50 @@ class JWTHandler:
             
             if user_id is None:
                 raise AuthenticationError("Invalid token: missing subject")
-            
-            return TokenData(user_id=user_id, type=token_type, payload=payload)
         except jwt.ExpiredSignatureError:
             raise AuthenticationError("Token has expired")
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             raise AuthenticationError("Invalid token")
+        
+        token_data = TokenData(user_id=user_id, type=token_type, payload=payload)
+        token_cache.set(token, token_data)
+        return token_data
+    
+    @staticmethod
+    def get_cached_claims(token: str) -> Optional[Dict[str, Any]]:
+        """Return claims of an already verified token without decoding it again.
+        
+        Returns None if the token has not been verified recently; callers must
+        then fall back to ``verify_token``.
+        """
+        token_data = token_cache.get(token)
+        return token_data.payload if token_data is not None else None
+    
+    @staticmethod
+    def revoke_token(token: str):
+        """Drop a token from the verification cache"""
+        token_cache.invalidate(token)
+
+
+# Atomically count a failed attempt and convert to a lockout at the threshold.
+# KEYS[1] attempts key, KEYS[2] lockout key, ARGV[1] max attempts, ARGV[2] ttl.
+# Returns -1 if already locked out, 0 if this attempt triggered the lockout,
+# otherwise the current attempt count.
+_CHECK_AND_INCREMENT_LUA = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return -1
+end
+local attempts = redis.call('INCR', KEYS[1])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+if attempts >= tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[2], 'locked', 'EX', ARGV[2])
+    redis.call('DEL', KEYS[1])
+    return 0
+end
+return attempts
+"""
 
 
 class BruteForceProtection:
@@ -163,35 +353,29 @@ class BruteForceProtection:
     def __init__(self, max_attempts: int = 5, lockout_time: int = 900):
         self.max_attempts = max_attempts
         self.lockout_time = lockout_time  # 15 minutes
+        self._check_and_increment = None
+    
+    async def _get_script(self):
+        """Register the check-and-increment script once per process"""
+        if self._check_and_increment is None:
+            redis = await get_redis()
+            self._check_and_increment = redis.register_script(_CHECK_AND_INCREMENT_LUA)
+        return self._check_and_increment
     
     async def check_attempts(self, identifier: str) -> bool:
         """Check if identifier is locked out"""
         redis = await get_redis()
-        attempts_key = f"login_attempts:{identifier}"
-        lockout_key = f"lockout:{identifier}"
-        
-        # Check if locked out
-        if await redis.exists(lockout_key):
-            return False
         
-        # Get current attempts
-        attempts = await redis.get(attempts_key)
-        if attempts and int(attempts) >= self.max_attempts:
-            # Lock out the identifier
-            await redis.setex(lockout_key, self.lockout_time, "locked")
-            await redis.delete(attempts_key)
-            return False
-        
-        return True
-    
-    async def record_failed_attempt(self, identifier: str):
-        """Record a failed login attempt"""
-        redis = await get_redis()
-        attempts_key = f"login_attempts:{identifier}"
-        
-        # Increment attempts with expiry
-        await redis.incr(attempts_key)
-        await redis.expire(attempts_key, self.lockout_time)
+        # Lockouts are set atomically when the failure threshold is reached
+        return not await redis.exists(f"lockout:{identifier}")
+    
+    async def record_failed_attempt(self, identifier: str) -> int:
+        """Record a failed login attempt in a single atomic round-trip"""
+        script = await self._get_script()
+        return await script(
+            keys=[f"login_attempts:{identifier}", f"lockout:{identifier}"],
+            args=[self.max_attempts, self.lockout_time]
+        )
     
     async def clear_attempts(self, identifier: str):
         """Clear failed attempts on successful login"""
@@ -199,8 +383,103 @@ class BruteForceProtection:
         attempts_key = f"login_attempts:{identifier}"
         lockout_key = f"lockout:{identifier}"
         
-        await redis.delete(attempts_key)
-        await redis.delete(lockout_key)
+        await redis.delete(attempts_key, lockout_key)
+
+
+@dataclass
+class CachedUser:
+    """Detached snapshot of the user fields read by authenticated routes.
+
+    Deliberately excludes credentials (password hash, API key). Routes that
+    need to mutate the user must load the ORM entity by ``id``.
+    """
+    id: str
+    email: str
+    role: UserRole
+    is_active: bool
+    is_verified: bool = False
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    company: Optional[str] = None
+    job_title: Optional[str] = None
+    region: Optional[str] = None
+    kyc_status: Optional[str] = None
+    last_login_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    
+    _DATETIME_FIELDS = ("last_login_at", "created_at")
+    
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            company=user.company,
+            job_title=user.job_title,
+            region=user.region,
+            kyc_status=user.kyc_status,
+            last_login_at=user.last_login_at,
+            created_at=user.created_at
+        )
+    
+    def to_json(self) -> bytes:
+        data = asdict(self)
+        data["role"] = self.role.value
+        return orjson.dumps(data)
+    
+    @classmethod
+    def from_json(cls, raw: bytes) -> "CachedUser":
+        data = orjson.loads(raw)
+        data["role"] = UserRole(data["role"])
+        for field_name in cls._DATETIME_FIELDS:
+            if data.get(field_name):
+                data[field_name] = datetime.fromisoformat(data[field_name])
+        return cls(**data)
+
+
+class UserCache:
+    """Cache-aside store for authenticated user snapshots in Redis"""
+    
+    KEY_PREFIX = "user:"
+    
+    @staticmethod
+    async def get(user_id: str) -> Optional[CachedUser]:
+        """Get cached user, returns None on miss or Redis failure"""
+        try:
+            redis = await get_redis()
+            raw = await redis.get(f"{UserCache.KEY_PREFIX}{user_id}")
+        except aioredis.RedisError as e:
+            logger.warning("User cache read failed", user_id=user_id, error=str(e))
+            return None
+        
+        return CachedUser.from_json(raw) if raw else None
+    
+    @staticmethod
+    async def set(user: CachedUser):
+        """Store user snapshot with the configured TTL"""
+        try:
+            redis = await get_redis()
+            await redis.setex(
+                f"{UserCache.KEY_PREFIX}{user.id}",
+                settings.user_cache_ttl,
+                user.to_json()
+            )
+        except aioredis.RedisError as e:
+            logger.warning("User cache write failed", user_id=user.id, error=str(e))
+    
+    @staticmethod
+    async def invalidate(user_id: str):
+        """Drop cached user; call after any change to cached user fields"""
+        try:
+            redis = await get_redis()
+            await redis.delete(f"{UserCache.KEY_PREFIX}{user_id}")
+        except aioredis.RedisError as e:
+            logger.warning("User cache invalidation failed", user_id=user_id, error=str(e))
 
 
 class SessionManager:
@@ -214,19 +493,22 @@ class SessionManager:
     ) -> str:
         """Create user session"""
         redis = await get_redis()
-        session_id = f"session:{user_id}:{datetime.utcnow().timestamp()}"
+        session_id = f"session:{user_id}:{secrets.token_urlsafe(16)}"
+        now = utcnow_iso()
         
         session_data = {
             "user_id": user_id,
-            "ip_address": request.client.host if request.client else "unknown",
-            "user_agent": request.headers.get("user-agent", "unknown"),
-            "created_at": datetime.utcnow().isoformat(),
-            "last_activity": datetime.utcnow().isoformat()
+            "ip_address": get_client_host(request),
+            "user_agent": get_user_agent(request),
+            "created_at": now,
+            "last_activity": now
         }
         
         # Store in Redis
-        await redis.hset(session_id, mapping=session_data)
-        await redis.expire(session_id, settings.jwt_expiration_hours * 3600)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(session_id, mapping=session_data)
+            pipe.expire(session_id, settings.jwt_expiration_hours * 3600)
+            await pipe.execute()
         
         # Store in database for audit
         db_session = UserSession(
@@ -247,15 +529,83 @@ class SessionManager:
         return await redis.exists(session_id)
     
     @staticmethod
-    async def invalidate_session(session_id: str):
-        """Invalidate user session"""
+    async def invalidate_session(session_id: str, token: Optional[str] = None):
+        """Invalidate user session and evict its token from the verification cache"""
         redis = await get_redis()
         await redis.delete(session_id)
+        if token:
+            JWTHandler.revoke_token(token)
 
 
 # Initialize brute force protection
 brute_force_protection = BruteForceProtection()
 
+# Columns read by the login flow (authenticate_user and the login response)
+_LOGIN_COLUMNS = (
+    User.id, User.email, User.password_hash, User.is_active, User.is_verified,
+    User.role, User.first_name, User.last_name
+)
+
+# Columns copied into CachedUser
+_SNAPSHOT_COLUMNS = tuple(getattr(User, name) for name in CachedUser.__dataclass_fields__)
+
+# Hot auth queries, built once and executed with bound parameters
+_USER_BY_EMAIL = (
+    select(User)
+    .options(load_only(*_LOGIN_COLUMNS))
+    .where(User.email == bindparam("email"))
+)
+_USER_BY_ID = (
+    select(User)
+    .options(load_only(*_SNAPSHOT_COLUMNS))
+    .where(User.id == bindparam("user_id"))
+)
+_ACTIVE_USER_BY_API_KEY = (
+    select(User)
+    .options(load_only(*_SNAPSHOT_COLUMNS))
+    .where(User.api_key == bindparam("api_key"), User.is_active == True)
+)
+
+
+# Strong references to in-flight background tasks so they are not garbage collected
+_background_tasks: set = set()
+
+
+def _spawn_background(coro):
+    """Run a coroutine in the background, keeping a reference until it finishes"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _update_last_login(user_id: str, login_at: datetime, ip_address: str):
+    """Record last login time and IP using a short-lived session"""
+    db = await get_db_session()
+    try:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(last_login_at=login_at, last_login_ip=ip_address)
+        )
+        await db.commit()
+        await UserCache.invalidate(user_id)
+    except Exception as e:
+        logger.error("Failed to update last login", user_id=user_id, error=str(e))
+        await db.rollback()
+    finally:
+        await db.close()
+
+
+async def _failed_login_delay(db: AsyncSession, base_delay: float):
+    """Slow down a failed login without holding a pooled connection.
+    
+    The session is closed first so the sleep does not pin a database
+    connection, and jitter is added to blunt timing oracles.
+    """
+    await db.close()
+    await asyncio.sleep(base_delay + random.random() * 0.5)
+
 
 async def authenticate_user(
     email: str,
@@ -267,37 +617,37 @@ async def authenticate_user(
     
     # Check brute force protection
     if not await brute_force_protection.check_attempts(email):
-        await asyncio.sleep(2)  # Rate limit failed attempts
+        await _failed_login_delay(db, 2)  # Rate limit failed attempts
         raise AuthenticationError("Account temporarily locked due to multiple failed attempts")
     
     # Get user from database
-    result = await db.execute(
-        select(User).where(User.email == email)
-    )
+    result = await db.execute(_USER_BY_EMAIL, {"email": email})
     user = result.scalar_one_or_none()
     
     if not user:
         await brute_force_protection.record_failed_attempt(email)
-        await asyncio.sleep(1)  # Rate limit
+        await _failed_login_delay(db, 1)  # Rate limit
         raise AuthenticationError("Invalid email or password")
     
     # Check if user is active
     if not user.is_active:
         raise AuthenticationError("Account is disabled")
     
-    # Verify password
-    if not PasswordHandler.verify_password(password, user.password_hash):
+    # Verify password, skipping the KDF for an attempt that was just rejected
+    if (
+        failed_password_cache.contains(email, password, user.password_hash)
+        or not await PasswordHandler.verify_password_async(password, user.password_hash)
+    ):
+        failed_password_cache.add(email, password, user.password_hash)
         await brute_force_protection.record_failed_attempt(email)
-        await asyncio.sleep(1)  # Rate limit
+        await _failed_login_delay(db, 1)  # Rate limit
         raise AuthenticationError("Invalid email or password")
     
     # Clear failed attempts on successful login
     await brute_force_protection.clear_attempts(email)
     
-    # Update last login
-    user.last_login_at = datetime.utcnow()
-    user.last_login_ip = request.client.host if request.client else "unknown"
-    await db.commit()
+    # Update last login off the request path
+    _spawn_background(_update_last_login(user.id, datetime.utcnow(), get_client_host(request)))
     
     logger.info("User authenticated successfully", user_id=user.id, email=user.email)
     
@@ -305,10 +655,15 @@ async def authenticate_user(
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
+) -> CachedUser:
+    """Get current authenticated user, resolved at most once per request"""
+    
+    resolved = getattr(request.state, "current_user", None)
+    if resolved is not None:
+        return resolved
     
     token = credentials.credentials
     token_data = JWTHandler.verify_token(token)
@@ -316,35 +671,36 @@ async def get_current_user(
     if token_data.type != "access":
         raise AuthenticationError("Invalid token type")
     
-    # Get user from database
-    result = await db.execute(
-        select(User).where(User.id == token_data.user_id)
-    )
-    user = result.scalar_one_or_none()
+    user = await UserCache.get(token_data.user_id)
     
-    if not user:
-        raise AuthenticationError("User not found")
+    if user is None:
+        # Cache miss, load from database
+        result = await db.execute(_USER_BY_ID, {"user_id": token_data.user_id})
+        db_user = result.scalar_one_or_none()
+        
+        if not db_user:
+            raise AuthenticationError("User not found")
+        
+        user = CachedUser.from_user(db_user)
+        await UserCache.set(user)
     
     if not user.is_active:
         raise AuthenticationError("User account is disabled")
     
+    request.state.current_user = user
     return user
 
 
-async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Get current active user"""
-    if not current_user.is_active:
-        raise AuthenticationError("Inactive user")
-    return current_user
+# get_current_user already rejects inactive users; kept as an alias so the
+# dependency resolves to the same callable and shares FastAPI's per-request cache
+get_current_active_user = get_current_user
 
 
 def require_roles(required_roles: List[UserRole]):
     """Dependency to require specific roles"""
     async def check_roles(
-        current_user: User = Depends(get_current_active_user)
-    ) -> User:
+        current_user: CachedUser = Depends(get_current_user)
+    ) -> CachedUser:
         if current_user.role not in required_roles:
             raise AuthorizationError(
                 f"Insufficient permissions. Required roles: {[role.value for role in required_roles]}"
@@ -367,7 +723,7 @@ def require_trader():
 async def validate_api_key(
     request: Request,
     db: AsyncSession = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[CachedUser]:
     """Validate API key authentication"""
     api_key = request.headers.get("X-API-Key")
     
@@ -375,16 +731,19 @@ async def validate_api_key(
         return None
     
     # Get user by API key
-    result = await db.execute(
-        select(User).where(User.api_key == api_key, User.is_active == True)
-    )
+    result = await db.execute(_ACTIVE_USER_BY_API_KEY, {"api_key": api_key})
     user = result.scalar_one_or_none()
     
-    if user:
-        # Update API key usage
-        user.api_key_last_used = datetime.utcnow()
-        await db.commit()
-        
-        logger.info("API key authenticated", user_id=user.id, api_key=api_key[:8] + "...")
+    if user is None:
+        return None
+    
+    # Snapshot before the commit expires the loaded attributes
+    snapshot = CachedUser.from_user(user)
+    
+    # Update API key usage
+    user.api_key_last_used = datetime.utcnow()
+    await db.commit()
+    
+    logger.info("API key authenticated", user_id=snapshot.id, api_key=api_key[:8] + "...")
     
-    return user
\ No newline at end of file
+    return snapshot
\ No newline at end of file
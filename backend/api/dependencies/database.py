@@ -4,41 +4,68 @@ Database Dependencies
 SQLAlchemy async database session management and connection pooling.
 """
 
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from functools import lru_cache
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List
+from sqlalchemy.sql import Select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
+import orjson
 import structlog
 
 from ..utils.config import get_settings
+from ..utils.logging import orjson_dumps
 
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
 
-# Create async engine with connection pooling
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_size=settings.database_pool_size,
-    max_overflow=settings.database_max_overflow,
-    pool_pre_ping=True,
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    connect_args={"command_timeout": settings.query_timeout}
-)
-
-# Create session maker
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-    autocommit=False
-)
+# Dialects that support INSERT ... ON CONFLICT DO NOTHING
+_CONFLICT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> AsyncEngine:
+    """Create the async engine with connection pooling on first use"""
+    return create_async_engine(
+        settings.database_url,
+        echo=settings.debug,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_pre_ping=settings.database_pool_pre_ping,
+        pool_recycle=settings.database_pool_recycle,
+        json_serializer=orjson_dumps,
+        json_deserializer=orjson.loads,
+        connect_args={
+            "command_timeout": settings.query_timeout,
+            # Reuse server-side prepared statements for hot queries
+            "statement_cache_size": 1024,
+            "prepared_statement_cache_size": 512
+        }
+    )
+
+
+@lru_cache(maxsize=1)
+def get_sessionmaker() -> async_sessionmaker:
+    """Get session maker bound to the shared engine"""
+    return async_sessionmaker(
+        bind=get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        autocommit=False
+    )
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session"""
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         try:
             yield session
         except Exception as e:
@@ -51,4 +78,52 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 async def get_db_session() -> AsyncSession:
     """Get database session (for internal use)"""
-    return AsyncSessionLocal()
\ No newline at end of file
+    return get_sessionmaker()()
+
+
+async def insert_ignoring_conflicts(
+    db: AsyncSession,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    conflict_column: Any,
+    returning: Any
+) -> List[Any]:
+    """Insert rows, skipping any that conflict on a unique column.
+
+    Returns the ``returning`` value of each row actually inserted. The caller
+    commits, so the insert can share a transaction with other writes.
+    """
+    conflict_insert = _CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    
+    if conflict_insert is not None:
+        result = await db.execute(
+            conflict_insert(model)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[conflict_column])
+            .returning(returning)
+        )
+        return list(result.scalars())
+    
+    # Other dialects rely on the unique constraint, one savepoint per row
+    inserted = []
+    for row in rows:
+        instance = model(**row)
+        try:
+            async with db.begin_nested():
+                db.add(instance)
+        except IntegrityError:
+            continue
+        inserted.append(getattr(instance, returning.key))
+    return inserted
+
+
+async def stream_ndjson(stmt: Select) -> AsyncIterator[bytes]:
+    """Yield query rows as newline-delimited JSON without buffering the result.
+
+    Opens its own session because request-scoped sessions from ``get_db`` are
+    closed before a streaming response body is sent.
+    """
+    async with get_sessionmaker()() as session:
+        result = await session.stream(stmt)
+        async for row in result:
+            yield orjson.dumps(dict(row._mapping)) + b"\n"
@@ -4,23 +4,379 @@ Logging Dependencies
 Structured logging, audit trails, and security event logging.
 """
 
-import json
+import asyncio
+import os
+import re
 import time
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from fastapi import Request, Response
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
+import orjson
 import structlog
 import hashlib
 
 from ..dependencies.database import get_db_session
 from ..models.audit_log import AuditLog, AuditAction, AuditResource
+from ..utils.clock import utcnow_iso
 from ..utils.config import get_settings
+from ..utils.request_meta import get_client_host, get_user_agent
 
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
 
+# Query parameter names whose values must never reach the logs
+_SENSITIVE_PARAM_RE = re.compile(r"password|token|secret|key|auth", re.IGNORECASE)
+
+
+class AuditLogBatcher:
+    """Background writer that persists audit entries in batches.
+    
+    Entries are queued by request handlers and drained by a single task that
+    inserts up to ``batch_size`` rows per commit, flushing at least every
+    ``flush_interval`` seconds. A full queue applies back-pressure to callers.
+    Transient failures are retried with backoff; rows the database rejects,
+    and batches still failing at shutdown, are written to the application
+    log instead.
+    """
+    
+    # Longest wait between retries of a failing batch
+    MAX_RETRY_DELAY = 30.0
+    # Attempts made for a failing batch once stop() has been requested
+    STOP_ATTEMPTS = 3
+    
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+        max_queue_size: int = 10000
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.backpressure_waits = 0
+    
+    def start(self):
+        """Start the background writer if it is not running"""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Flush queued entries and stop the background writer"""
+        if self._task is None or self._task.done():
+            return
+        self._stopping = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+    
+    async def submit(self, entry: Dict[str, Any]):
+        """Queue an audit entry for the next batch"""
+        self.start()
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            # Audit records are not dropped here; count the stall instead
+            self.backpressure_waits += 1
+            logger.warning("Audit queue full, waiting for writer", queued=self._queue.qsize())
+            await self._queue.put(entry)
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        db = await get_db_session()
+        try:
+            stopping = False
+            while not stopping:
+                entry = await self._queue.get()
+                if entry is None:
+                    break
+                
+                batch = [entry]
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if entry is None:
+                        stopping = True
+                        break
+                    batch.append(entry)
+                
+                await self._write_batch(db, batch)
+        finally:
+            await db.close()
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Whether a failed write may succeed if retried unchanged"""
+        if isinstance(error, (OperationalError, InterfaceError)):
+            return True
+        if isinstance(error, DBAPIError):
+            return error.connection_invalidated
+        return isinstance(error, (ConnectionError, asyncio.TimeoutError))
+    
+    async def _write_batch(self, db: AsyncSession, batch: List[Dict[str, Any]]):
+        delay = self.flush_interval
+        failures = 0
+        while True:
+            try:
+                await db.execute(insert(AuditLog), batch)
+                await db.commit()
+                return
+            except Exception as e:
+                failures += 1
+                try:
+                    await db.rollback()
+                except Exception:
+                    pass
+                
+                if not self._is_transient(e):
+                    if len(batch) > 1:
+                        # Isolate the rows that cannot be stored so the rest are kept
+                        for entry in batch:
+                            await self._write_batch(db, [entry])
+                        return
+                    logger.error("Audit entry rejected by database", error=str(e), entries=batch)
+                    return
+                
+                if self._stopping and failures >= self.STOP_ATTEMPTS:
+                    # Last resort: keep the entries in the application log
+                    logger.error(
+                        "Audit batch could not be written before shutdown",
+                        error=str(e),
+                        entries=batch
+                    )
+                    return
+                
+                logger.error(
+                    "Failed to write audit batch, will retry",
+                    error=str(e), entries=len(batch), attempt=failures
+                )
+                await asyncio.sleep(delay)
+                delay = min(max(delay, 0.1) * 2, self.MAX_RETRY_DELAY)
+
+
+class JSONLAuditSink:
+    """Append-only JSONL audit log shipped to central storage by an external agent.
+    
+    Keeps database and network latency off the request path entirely. Lines are
+    hash-chained: each carries the previous line's ``hash`` as ``prev_hash`` and
+    its own ``hash`` over the serialized line, so edits or deletions are evident.
+    
+    Entries stay pending, and the chain does not advance, until their lines are
+    on disk; failed writes are retried with backoff. A full queue applies
+    back-pressure to callers.
+    """
+    
+    # Upper bound on lines taken off the queue for a single write
+    MAX_WRITE_LINES = 1000
+    # Longest wait between retries of a failing write
+    MAX_RETRY_DELAY = 30.0
+    # Attempts made for remaining entries once stop() has been requested
+    STOP_ATTEMPTS = 3
+    
+    def __init__(self, path: str, flush_interval: float = 0.2, max_queue_size: int = 10000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        # Records taken off the queue whose lines are not yet on disk
+        self._unwritten: List[Dict[str, Any]] = []
+        self._prev_hash: Optional[str] = None
+        self._chain_loaded = False
+        self._task: Optional[asyncio.Task] = None
+        self.backpressure_waits = 0
+    
+    def start(self):
+        """Start the background flusher if it is not running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Write pending lines and stop the background flusher"""
+        if self._task is None or self._task.done():
+            return
+        # The flusher finishes any in-flight write before it sees the sentinel
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+    
+    async def submit(self, entry: Dict[str, Any]):
+        """Queue an audit entry for the next flush"""
+        self.start()
+        record = {
+            "timestamp": entry["timestamp"].isoformat(),
+            "event": "user_action",
+            "action": entry["action"].value,
+            "subject": entry["user_id"],
+            "resource": entry["resource"].value,
+            "resource_id": entry["resource_id"],
+            "source_ip": entry["ip_address"],
+            "user_agent": entry["user_agent"],
+            "details": entry["details"]
+        }
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.backpressure_waits += 1
+            logger.warning("Audit log queue full, waiting for writer", queued=self._queue.qsize())
+            await self._queue.put(record)
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        delay = self.flush_interval
+        stopping = False
+        while not stopping:
+            if not self._unwritten:
+                record = await self._queue.get()
+                if record is None:
+                    break
+                self._unwritten.append(record)
+            
+            # Collect for one flush interval, or one retry delay after a failure
+            deadline = loop.time() + delay
+            while len(self._unwritten) < self.MAX_WRITE_LINES:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                self._unwritten.append(record)
+            
+            if await self._flush():
+                delay = self.flush_interval
+            else:
+                delay = min(max(delay, self.flush_interval) * 2, self.MAX_RETRY_DELAY)
+        
+        # Stopping: write what remains, then fall back to the application log
+        failures = 0
+        while True:
+            while not self._queue.empty() and len(self._unwritten) < self.MAX_WRITE_LINES:
+                record = self._queue.get_nowait()
+                if record is not None:
+                    self._unwritten.append(record)
+            if not self._unwritten:
+                return
+            if await self._flush():
+                continue
+            failures += 1
+            if failures >= self.STOP_ATTEMPTS:
+                break
+            await asyncio.sleep(min(self.flush_interval * 2 ** failures, self.MAX_RETRY_DELAY))
+        
+        logger.error(
+            "Audit log entries could not be written before shutdown",
+            path=self.path,
+            entries=self._unwritten
+        )
+        self._unwritten = []
+    
+    async def _flush(self) -> bool:
+        """Write the unwritten records, advancing the chain only on success"""
+        if not self._unwritten:
+            return True
+        loop = asyncio.get_running_loop()
+        try:
+            if not self._chain_loaded:
+                self._prev_hash = await loop.run_in_executor(None, self._read_last_hash)
+                self._chain_loaded = True
+            
+            prev_hash = self._prev_hash
+            lines = []
+            writable = []
+            for record in self._unwritten:
+                line = dict(record, prev_hash=prev_hash)
+                try:
+                    line["hash"] = hashlib.sha256(orjson.dumps(line)).hexdigest()
+                    encoded = orjson.dumps(line)
+                except TypeError as e:
+                    # Unserializable details; keep the record out of the chain
+                    logger.error(
+                        "Audit entry could not be serialized",
+                        path=self.path, error=str(e), entry=record
+                    )
+                    continue
+                prev_hash = line["hash"]
+                lines.append(encoded)
+                writable.append(record)
+            self._unwritten = writable
+            if not lines:
+                return True
+            
+            await loop.run_in_executor(None, self._append, b"\n".join(lines) + b"\n")
+        except OSError as e:
+            logger.error(
+                "Failed to write audit log file, will retry",
+                path=self.path, error=str(e), entries=len(self._unwritten)
+            )
+            return False
+        
+        self._prev_hash = prev_hash
+        self._unwritten = []
+        return True
+    
+    def _append(self, data: bytes):
+        with open(self.path, "ab") as f:
+            start = f.tell()
+            try:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            except OSError:
+                # Drop any partial write so the retry does not leave a broken line
+                f.truncate(start)
+                raise
+    
+    def _read_last_hash(self) -> Optional[str]:
+        """Resume the hash chain from the last line of an existing file"""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - 65536))
+                tail = f.read().rstrip(b"\n")
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            return None
+        
+        if not tail:
+            return None
+        try:
+            return orjson.loads(tail.rsplit(b"\n", 1)[-1]).get("hash")
+        except orjson.JSONDecodeError:
+            logger.warning("Audit log file has a malformed last line", path=self.path)
+            return None
+
+
+# Audit entries go to a local JSONL file when configured, otherwise to the database
+audit_batcher = AuditLogBatcher(
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval,
+    max_queue_size=settings.audit_queue_size
+)
+audit_sink = (
+    JSONLAuditSink(
+        settings.audit_log_file,
+        flush_interval=settings.audit_flush_interval,
+        max_queue_size=settings.audit_queue_size
+    )
+    if settings.audit_log_file else audit_batcher
+)
+
 
 class AuditLogger:
     """Comprehensive audit logging system"""
@@ -35,38 +391,26 @@ class AuditLogger:
         request: Optional[Request] = None
     ):
         """Log user action for audit trail"""
-        db = await get_db_session()
+        await audit_sink.submit({
+            "user_id": user_id,
+            "action": action,
+            "resource": resource,
+            "resource_id": resource_id,
+            "details": details or {},
+            "ip_address": get_client_host(request),
+            "user_agent": get_user_agent(request),
+            "timestamp": datetime.utcnow()
+        })
         
-        try:
-            audit_entry = AuditLog(
-                user_id=user_id,
-                action=action,
-                resource=resource,
-                resource_id=resource_id,
-                details=details or {},
-                ip_address=request.client.host if request and request.client else "unknown",
-                user_agent=request.headers.get("user-agent", "unknown") if request else "unknown",
-                timestamp=datetime.utcnow()
-            )
-            
-            db.add(audit_entry)
-            await db.commit()
-            
-            # Also log to structured logger
-            logger.info(
-                "User action logged",
-                user_id=user_id,
-                action=action.value,
-                resource=resource.value,
-                resource_id=resource_id,
-                details=details
-            )
-            
-        except Exception as e:
-            logger.error("Failed to log audit entry", error=str(e))
-            await db.rollback()
-        finally:
-            await db.close()
+        # Also log to structured logger
+        logger.info(
+            "User action logged",
+            user_id=user_id,
+            action=action.value,
+            resource=resource.value,
+            resource_id=resource_id,
+            details=details
+        )
     
     @staticmethod
     async def log_security_event(
@@ -83,9 +427,9 @@ class AuditLogger:
             "severity": severity,
             "description": description,
             "user_id": user_id,
-            "ip_address": request.client.host if request and request.client else "unknown",
-            "user_agent": request.headers.get("user-agent", "unknown") if request else "unknown",
-            "timestamp": datetime.utcnow().isoformat(),
+            "ip_address": get_client_host(request),
+            "user_agent": get_user_agent(request),
+            "timestamp": utcnow_iso(),
             "additional_data": additional_data or {}
         }
         
@@ -114,13 +458,12 @@ class AuditLogger:
         """Log API access for monitoring"""
         # Sanitize sensitive data from URLs
         path = request.url.path
-        query_params = dict(request.query_params)
         
         # Remove sensitive parameters
-        sensitive_params = ["password", "token", "secret", "key", "auth"]
-        for param in list(query_params.keys()):
-            if any(sensitive in param.lower() for sensitive in sensitive_params):
-                query_params[param] = "[REDACTED]"
+        query_params = {
+            param: "[REDACTED]" if _SENSITIVE_PARAM_RE.search(param) else value
+            for param, value in request.query_params.items()
+        }
         
         access_data = {
             "method": request.method,
@@ -128,11 +471,11 @@ class AuditLogger:
             "query_params": query_params,
             "status_code": response.status_code,
             "user_id": user_id,
-            "ip_address": request.client.host if request.client else "unknown",
-            "user_agent": request.headers.get("user-agent", "unknown"),
+            "ip_address": get_client_host(request),
+            "user_agent": get_user_agent(request),
             "processing_time_ms": round(processing_time * 1000, 2) if processing_time else None,
             "content_length": response.headers.get("content-length"),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": utcnow_iso()
         }
         
         # Log with appropriate level based on status code
@@ -168,8 +511,11 @@ class RequestLogger:
     @staticmethod
     def get_request_id(request: Request) -> str:
         """Generate unique request ID"""
-        request_data = f"{request.method}:{request.url}:{time.time()}"
-        return hashlib.md5(request_data.encode()).hexdigest()[:16]
+        hasher = hashlib.blake2b(digest_size=8)
+        hasher.update(request.method.encode())
+        hasher.update(request.url.path.encode())
+        hasher.update(time.time_ns().to_bytes(8, "big"))
+        return hasher.hexdigest()
 
 
 class ComplianceLogger:
@@ -198,7 +544,7 @@ class ComplianceLogger:
                 "quantity": quantity,
                 "price": price,
                 "region": region,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": utcnow_iso()
             },
             request=request
         )
@@ -231,7 +577,7 @@ class ComplianceLogger:
                 "check_type": check_type,
                 "result": result,
                 "details": details,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": utcnow_iso()
             },
             request=request
         )
@@ -262,7 +608,7 @@ class ComplianceLogger:
                 "risk_level": risk_level,
                 "description": description,
                 "metrics": metrics,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": utcnow_iso()
             },
             request=request
         )
@@ -297,7 +643,7 @@ class DataPrivacyLogger:
             details={
                 "data_type": data_type,
                 "purpose": purpose,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": utcnow_iso()
             },
             request=request
         )
@@ -319,7 +665,7 @@ class DataPrivacyLogger:
             details={
                 "data_types": data_types,
                 "format": format,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": utcnow_iso()
             },
             request=request
         )
@@ -341,7 +687,7 @@ class DataPrivacyLogger:
             details={
                 "data_types": data_types,
                 "reason": reason,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": utcnow_iso()
             },
             request=request
         )
@@ -5,13 +5,16 @@ Advanced rate limiting with Redis backend and user-based limits.
 """
 
 import hashlib
+import time
+import uuid
+from functools import lru_cache
 from typing import Callable
 from fastapi import Request, HTTPException, status
-from slowapi import Limiter
 from slowapi.util import get_remote_address
 import redis.asyncio as aioredis
 import structlog
 
+from .auth import JWTHandler
 from ..utils.config import get_settings
 
 
@@ -22,52 +25,86 @@ settings = get_settings()
 redis_client: aioredis.Redis = None
 
 
+def _create_limiter_redis() -> aioredis.Redis:
+    """Create the rate limiting client on a bounded connection pool"""
+    pool = aioredis.ConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=settings.redis_max_connections,
+        encoding="utf-8",
+        decode_responses=True
+    )
+    return aioredis.Redis(connection_pool=pool)
+
+
+async def init_limiter_redis():
+    """Create the rate limiting client and warm it up at startup"""
+    global redis_client
+    if redis_client is None:
+        redis_client = _create_limiter_redis()
+    
+    try:
+        await redis_client.ping()
+        for algorithm in _RATE_LIMIT_LUA:
+            script = await get_rate_limit_script(algorithm)
+            await redis_client.script_load(script.script)
+    except aioredis.RedisError as e:
+        logger.warning("Rate limit Redis warm-up failed", error=str(e))
+
+
+async def close_limiter_redis():
+    """Close the rate limiting client and its connection pool"""
+    global redis_client
+    if redis_client is not None:
+        await redis_client.aclose(close_connection_pool=True)
+        redis_client = None
+    # Registered scripts hold the closed client; re-register on next use
+    _rate_limit_scripts.clear()
+
+
 async def get_redis_for_limiter():
     """Get Redis client for rate limiting"""
     global redis_client
-    if not redis_client:
-        redis_client = aioredis.from_url(
-            settings.redis_url,
-            encoding="utf-8",
-            decode_responses=True
-        )
+    if redis_client is None:
+        # Only reached without the application lifespan (e.g. scripts, tests)
+        redis_client = _create_limiter_redis()
     return redis_client
 
 
 def get_user_id_for_rate_limiting(request: Request) -> str:
     """Get user ID for rate limiting, fall back to IP address"""
+    # Resolved once per request, however many limiters run
+    cached = getattr(request.state, "rl_identifier", None)
+    if cached is not None:
+        return cached
+    
+    identifier = None
+    
     # Try to get user ID from token
-    auth_header = request.headers.get("authorization", "")
-    if auth_header.startswith("Bearer "):
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme == "Bearer" and token:
         try:
-            from .auth import JWTHandler
-            token = auth_header.split(" ")[1]
             token_data = JWTHandler.verify_token(token)
-            return f"user:{token_data.user_id}"
+            identifier = f"user:{token_data.user_id}"
         except:
             pass
     
     # Fall back to IP address
-    return f"ip:{get_remote_address(request)}"
+    if identifier is None:
+        identifier = f"ip:{get_remote_address(request)}"
+    
+    request.state.rl_identifier = identifier
+    return identifier
 
 
 def get_api_key_for_rate_limiting(request: Request) -> str:
     """Get API key for rate limiting"""
     api_key = request.headers.get("X-API-Key", "")
     if api_key:
-        # Hash the API key for privacy
-        return f"api:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+        # Hash the API key for privacy (64-bit bucket key, same width as before)
+        return f"api:{hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()}"
     return get_user_id_for_rate_limiting(request)
 
 
-# Create limiter instance
-limiter = Limiter(
-    key_func=get_user_id_for_rate_limiting,
-    storage_uri=settings.redis_url,
-    default_limits=[f"{settings.rate_limit_per_minute}/minute"]
-)
-
-
 class RateLimitExceeded(HTTPException):
     """Rate limit exceeded exception"""
     def __init__(self, detail: str = "Rate limit exceeded"):
@@ -78,75 +115,210 @@ class RateLimitExceeded(HTTPException):
         )
 
 
-async def check_rate_limit(
-    request: Request,
-    limit_per_minute: int = None,
-    limit_per_hour: int = None
-):
-    """Custom rate limiting check"""
-    if not limit_per_minute and not limit_per_hour:
-        return  # No limits specified
+# Sliding-window log over sorted sets, checked and recorded atomically across windows.
+# KEYS: one sorted set per window. ARGV[1] now (ms), ARGV[2] unique request member,
+# followed by a (window_ms, limit) pair for each key.
+# Returns {1, 0, count} when allowed, otherwise {0, index of exceeded window, count}.
+_SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local count = 0
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[1 + 2 * i])
+    local limit = tonumber(ARGV[2 + 2 * i])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    count = redis.call('ZCARD', key)
+    if count >= limit then
+        return {0, i, count}
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, tonumber(ARGV[1 + 2 * i]) + 10000)
+end
+return {1, 0, count + 1}
+"""
+
+# Approximate sliding window from two fixed-window counters per key (a small hash
+# holding the current window number, its count and the previous window's count).
+# The estimate is prev * (1 - elapsed / window) + current.
+# KEYS: one hash per window. ARGV[1] now (ms), then a (window_ms, limit) pair per key.
+# Returns {1, 0, estimate} when allowed, otherwise {0, index of exceeded window, estimate}.
+_APPROXIMATE_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local state = {}
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[2 * i])
+    local limit = tonumber(ARGV[1 + 2 * i])
+    local current_window = math.floor(now / window)
+    local data = redis.call('HMGET', key, 'win', 'cnt', 'prev')
+    local win = tonumber(data[1])
+    local count = tonumber(data[2]) or 0
+    local previous = tonumber(data[3]) or 0
+    if win ~= current_window then
+        if win == current_window - 1 then
+            previous = count
+        else
+            previous = 0
+        end
+        count = 0
+    end
+    local estimate = previous * (1 - (now % window) / window) + count
+    if estimate + 1 > limit then
+        return {0, i, math.floor(estimate)}
+    end
+    state[i] = {current_window, count, previous, estimate}
+end
+local current = 0
+for i, key in ipairs(KEYS) do
+    local entry = state[i]
+    redis.call('HSET', key, 'win', entry[1], 'cnt', entry[2] + 1, 'prev', entry[3])
+    redis.call('PEXPIRE', key, 2 * tonumber(ARGV[2 * i]))
+    current = math.floor(entry[4]) + 1
+end
+return {1, 0, current}
+"""
+
+# Token bucket per key (a small hash holding the token count and last refill time).
+# Each bucket holds up to `limit` tokens and refills at limit / window per ms, so
+# short bursts up to the limit are allowed while the long-run rate stays bounded.
+# KEYS: one hash per window. ARGV[1] now (ms), then a (window_ms, limit) pair per key.
+# Returns {1, 0, used} when allowed, otherwise {0, index of exceeded window, used}.
+_TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local state = {}
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[2 * i])
+    local limit = tonumber(ARGV[1 + 2 * i])
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(data[1])
+    local ts = tonumber(data[2])
+    if tokens == nil or ts == nil then
+        tokens = limit
+    else
+        tokens = math.min(limit, tokens + math.max(0, now - ts) * limit / window)
+    end
+    if tokens < 1 then
+        return {0, i, limit - math.floor(tokens)}
+    end
+    state[i] = tokens - 1
+end
+local used = 0
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'tokens', state[i], 'ts', now)
+    redis.call('PEXPIRE', key, tonumber(ARGV[2 * i]))
+    used = tonumber(ARGV[1 + 2 * i]) - math.floor(state[i])
+end
+return {1, 0, used}
+"""
+
+# Rate limiting algorithms
+SLIDING_WINDOW = "sliding"          # Exact, one sorted-set entry per request
+APPROXIMATE_WINDOW = "approximate"  # ~16 bytes per key, O(1) per check
+TOKEN_BUCKET = "token_bucket"       # ~16 bytes per key, O(1) per check, allows bursts
+
+_RATE_LIMIT_LUA = {
+    SLIDING_WINDOW: _SLIDING_WINDOW_LUA,
+    APPROXIMATE_WINDOW: _APPROXIMATE_WINDOW_LUA,
+    TOKEN_BUCKET: _TOKEN_BUCKET_LUA,
+}
+
+# Key roots per algorithm, so switching algorithms never reuses incompatible keys
+_KEY_ROOTS = {
+    SLIDING_WINDOW: "rl",
+    APPROXIMATE_WINDOW: "rl:a",
+    TOKEN_BUCKET: "rl:b",
+}
+_rate_limit_scripts = {}
+
+
+async def get_rate_limit_script(algorithm: str):
+    """Register the script for a rate limiting algorithm once per process"""
+    script = _rate_limit_scripts.get(algorithm)
+    if script is None:
+        redis = await get_redis_for_limiter()
+        script = _rate_limit_scripts[algorithm] = redis.register_script(_RATE_LIMIT_LUA[algorithm])
+    return script
+
+
+def make_limiter(
+    per_minute: int = None,
+    per_hour: int = None,
+    algorithm: str = APPROXIMATE_WINDOW
+) -> Callable:
+    """Build a rate limit dependency with its windows and keys resolved up front"""
+    windows = []
+    if per_minute:
+        windows.append(("minute", "m", 60_000, per_minute))
+    if per_hour:
+        windows.append(("hour", "h", 3_600_000, per_hour))
     
-    redis = await get_redis_for_limiter()
-    identifier = get_user_id_for_rate_limiting(request)
+    if not windows:
+        async def no_limits(request: Request):
+            return  # No limits specified
+        return no_limits
     
-    # Check per-minute limit
-    if limit_per_minute:
-        minute_key = f"rate_limit:minute:{identifier}"
-        current_minute = await redis.incr(minute_key)
-        if current_minute == 1:
-            await redis.expire(minute_key, 60)
-        
-        if current_minute > limit_per_minute:
-            logger.warning(
-                "Rate limit exceeded (per minute)",
-                identifier=identifier,
-                limit=limit_per_minute,
-                current=current_minute
-            )
-            raise RateLimitExceeded("Rate limit exceeded: too many requests per minute")
+    # Short, fixed key prefixes: rl:{m|h}:{id}, rl:a:{m|h}:{id} and rl:b:{m|h}:{id}
+    key_root = _KEY_ROOTS[algorithm]
+    key_prefixes = tuple(f"{key_root}:{short}:" for _, short, _, _ in windows)
+    window_args = tuple(arg for _, _, window_ms, limit in windows for arg in (window_ms, limit))
+    needs_member = algorithm == SLIDING_WINDOW
     
-    # Check per-hour limit
-    if limit_per_hour:
-        hour_key = f"rate_limit:hour:{identifier}"
-        current_hour = await redis.incr(hour_key)
-        if current_hour == 1:
-            await redis.expire(hour_key, 3600)
+    async def check_limits(request: Request):
+        script = _rate_limit_scripts.get(algorithm) or await get_rate_limit_script(algorithm)
+        identifier = get_user_id_for_rate_limiting(request)
+        
+        now_ms = int(time.time() * 1000)
+        if needs_member:
+            args = (now_ms, uuid.uuid4().hex, *window_args)
+        else:
+            args = (now_ms, *window_args)
         
-        if current_hour > limit_per_hour:
+        allowed, exceeded, current = await script(
+            keys=[prefix + identifier for prefix in key_prefixes],
+            args=args
+        )
+        
+        if not allowed:
+            name, _, _, limit = windows[exceeded - 1]
             logger.warning(
-                "Rate limit exceeded (per hour)",
+                f"Rate limit exceeded (per {name})",
                 identifier=identifier,
-                limit=limit_per_hour,
-                current=current_hour
+                limit=limit,
+                current=current
             )
-            raise RateLimitExceeded("Rate limit exceeded: too many requests per hour")
-
-
-def rate_limit(per_minute: int = None, per_hour: int = None):
-    """Rate limiting decorator dependency"""
-    async def check_limits(request: Request):
-        await check_rate_limit(request, per_minute, per_hour)
+            raise RateLimitExceeded(f"Rate limit exceeded: too many requests per {name}")
     
     return check_limits
 
 
-# Common rate limit dependencies
-async def auth_rate_limit(request: Request):
-    """Rate limit for authentication endpoints"""
-    await check_rate_limit(request, limit_per_minute=10, limit_per_hour=100)
+# Ad hoc limits reuse one built limiter per distinct configuration
+_shared_limiter = lru_cache(maxsize=128)(make_limiter)
 
 
-async def api_rate_limit(request: Request):
-    """Standard API rate limit"""
-    await check_rate_limit(request, limit_per_minute=60, limit_per_hour=1000)
+async def check_rate_limit(
+    request: Request,
+    limit_per_minute: int = None,
+    limit_per_hour: int = None,
+    algorithm: str = APPROXIMATE_WINDOW
+):
+    """Custom rate limiting check, atomic across all windows in one round-trip"""
+    await _shared_limiter(limit_per_minute, limit_per_hour, algorithm)(request)
+
+
+def rate_limit(per_minute: int = None, per_hour: int = None, algorithm: str = APPROXIMATE_WINDOW):
+    """Rate limiting decorator dependency"""
+    return make_limiter(per_minute, per_hour, algorithm)
+
 
+# Common rate limit dependencies
+# Rate limit for authentication endpoints
+auth_rate_limit = make_limiter(per_minute=10, per_hour=100)
 
-async def trading_rate_limit(request: Request):
-    """Rate limit for trading endpoints"""
-    await check_rate_limit(request, limit_per_minute=30, limit_per_hour=500)
+# Standard API rate limit, applied router-wide
+api_rate_limit = make_limiter(per_minute=60, per_hour=1000, algorithm=TOKEN_BUCKET)
 
+# Rate limit for trading endpoints
+trading_rate_limit = make_limiter(per_minute=30, per_hour=500)
 
-async def admin_rate_limit(request: Request):
-    """Rate limit for admin endpoints"""
-    await check_rate_limit(request, limit_per_minute=100, limit_per_hour=2000)
\ No newline at end of file
+# Rate limit for admin endpoints
+admin_rate_limit = make_limiter(per_minute=100, per_hour=2000, algorithm=SLIDING_WINDOW)
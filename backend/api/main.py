@@ -10,22 +10,20 @@ import logging
 from contextlib import asynccontextmanager
 from typing import Dict, Any
 
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import JSONResponse, ORJSONResponse
 import structlog
 
 from .dependencies.auth import get_current_user
 from .dependencies.database import get_db
-from .dependencies.rate_limiting import limiter
+from .dependencies.rate_limiting import rate_limit, init_limiter_redis, close_limiter_redis
+from .dependencies.logging import audit_sink
 from .routes import auth, users, trading, onboarding, compliance, risk, bff
 from .utils.exceptions import setup_exception_handlers
 from .utils.middleware import setup_middleware
-from .utils.logging import setup_logging
+from .utils.logging import setup_logging, shutdown_logging
 from .models.database import init_database, close_database
 
 
@@ -45,6 +43,12 @@ async def lifespan(app: FastAPI):
     # Setup logging
     setup_logging()
     
+    # Start audit log writer
+    audit_sink.start()
+    
+    # Warm up the rate limiting Redis pool
+    await init_limiter_redis()
+    
     logger.info("Qenergyz API application started successfully")
     
     yield
@@ -52,10 +56,19 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Qenergyz API application")
     
+    # Flush pending audit entries
+    await audit_sink.stop()
+    
+    # Release rate limiting Redis connections
+    await close_limiter_redis()
+    
     # Close database connections
     await close_database()
     
     logger.info("Qenergyz API application shutdown completed")
+    
+    # Write out queued log records
+    shutdown_logging()
 
 
 def create_app() -> FastAPI:
@@ -68,6 +81,7 @@ def create_app() -> FastAPI:
         docs_url="/api/docs",
         redoc_url="/api/redoc",
         openapi_url="/api/openapi.json",
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
     
@@ -77,10 +91,6 @@ def create_app() -> FastAPI:
     # Setup exception handlers
     setup_exception_handlers(app)
     
-    # Add rate limiting
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-    
     # Include routers
     app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
     app.include_router(users.router, prefix="/api/v1/users", tags=["User Management"])
@@ -100,8 +110,11 @@ def create_app() -> FastAPI:
             "environment": "development"
         }
     
-    @app.get("/api/v1/status", tags=["API Status"])
-    @limiter.limit("100/minute")
+    @app.get(
+        "/api/v1/status",
+        tags=["API Status"],
+        dependencies=[Depends(rate_limit(per_minute=100))]
+    )
     async def api_status(request: Request):
         """API status endpoint with rate limiting"""
         return {
@@ -130,6 +143,8 @@ if __name__ == "__main__":
         "api.main:app",
         host="0.0.0.0",
         port=8000,
+        loop="uvloop",
+        http="httptools",
         reload=True,
         access_log=True,
         log_level="info"
@@ -10,22 +10,24 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 import structlog
 
 from ..dependencies.auth import (
+    AuthenticationError,
     authenticate_user,
     JWTHandler,
     PasswordHandler,
     get_current_user,
-    get_current_active_user,
-    SessionManager
+    SessionManager,
+    CachedUser,
+    UserCache
 )
-from ..dependencies.database import get_db
+from ..dependencies.database import get_db, insert_ignoring_conflicts
 from ..dependencies.rate_limiting import auth_rate_limit
 from ..dependencies.logging import audit_logger
 from ..models.user import User, UserRole
 from ..models.audit_log import AuditAction, AuditResource
+from ..schemas.common import Password, PersonName
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
@@ -34,14 +36,14 @@ router = APIRouter()
 # Request/Response Models
 class UserLogin(BaseModel):
     email: EmailStr
-    password: str = Field(..., min_length=8, max_length=128)
+    password: Password
 
 
 class UserRegister(BaseModel):
     email: EmailStr
-    password: str = Field(..., min_length=8, max_length=128)
-    first_name: str = Field(..., min_length=1, max_length=100)
-    last_name: str = Field(..., min_length=1, max_length=100)
+    password: Password
+    first_name: PersonName
+    last_name: PersonName
     phone: Optional[str] = Field(None, max_length=20)
     company: Optional[str] = Field(None, max_length=200)
     job_title: Optional[str] = Field(None, max_length=100)
@@ -56,8 +58,8 @@ class TokenResponse(BaseModel):
 
 
 class PasswordChange(BaseModel):
-    current_password: str = Field(..., min_length=8, max_length=128)
-    new_password: str = Field(..., min_length=8, max_length=128)
+    current_password: Password
+    new_password: Password
 
 
 @router.post("/login", response_model=TokenResponse)
@@ -123,18 +125,6 @@ async def register(
 ):
     """Register new user account"""
     
-    # Check if user already exists
-    result = await db.execute(
-        select(User).where(User.email == user_data.email)
-    )
-    existing_user = result.scalar_one_or_none()
-    
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
     # Validate password strength
     password_validation = PasswordHandler.validate_password_strength(user_data.password)
     if not password_validation["valid"]:
@@ -143,40 +133,44 @@ async def register(
             detail=f"Password requirements not met: {', '.join(password_validation['errors'])}"
         )
     
-    # Create new user
-    new_user = User(
-        email=user_data.email,
-        password_hash=PasswordHandler.hash_password(user_data.password),
-        first_name=user_data.first_name,
-        last_name=user_data.last_name,
-        phone=user_data.phone,
-        company=user_data.company,
-        job_title=user_data.job_title,
-        role=UserRole.USER,
-        is_active=True,
-        is_verified=False  # Email verification required
-    )
-    
-    db.add(new_user)
+    # Create new user, letting the unique email constraint detect duplicates
+    created = await insert_ignoring_conflicts(db, User, [{
+        "email": user_data.email,
+        "password_hash": await PasswordHandler.hash_password_async(user_data.password),
+        "first_name": user_data.first_name,
+        "last_name": user_data.last_name,
+        "phone": user_data.phone,
+        "company": user_data.company,
+        "job_title": user_data.job_title,
+        "role": UserRole.USER,
+        "is_active": True,
+        "is_verified": False  # Email verification required
+    }], conflict_column=User.email, returning=User.id)
     await db.commit()
-    await db.refresh(new_user)
+    
+    if not created:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    user_id = created[0]
     
     # Log user creation
     await audit_logger.log_user_action(
-        user_id=new_user.id,
+        user_id=user_id,
         action=AuditAction.USER_CREATED,
         resource=AuditResource.USER,
-        resource_id=new_user.id,
-        details={"email": new_user.email, "role": new_user.role.value},
+        resource_id=user_id,
+        details={"email": user_data.email, "role": UserRole.USER.value},
         request=request
     )
     
-    logger.info("New user registered", user_id=new_user.id, email=new_user.email)
+    logger.info("New user registered", user_id=user_id, email=user_data.email)
     
     return {
         "message": "User registered successfully",
-        "user_id": new_user.id,
-        "email": new_user.email,
+        "user_id": user_id,
+        "email": user_data.email,
         "verification_required": True
     }
 
@@ -184,7 +178,7 @@ async def register(
 @router.post("/logout")
 async def logout(
     request: Request,
-    current_user: User = Depends(get_current_active_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Logout current user and invalidate session"""
@@ -208,7 +202,7 @@ async def logout(
 
 @router.get("/me", response_model=dict)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user)
+    current_user: CachedUser = Depends(get_current_user)
 ):
     """Get current user information"""
     
@@ -233,13 +227,17 @@ async def get_current_user_info(
 async def change_password(
     password_data: PasswordChange,
     request: Request,
-    current_user: User = Depends(get_current_active_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Change user password"""
     
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise AuthenticationError("User not found")
+    
     # Verify current password
-    if not PasswordHandler.verify_password(password_data.current_password, current_user.password_hash):
+    if not await PasswordHandler.verify_password_async(password_data.current_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -254,10 +252,11 @@ async def change_password(
         )
     
     # Update password
-    current_user.password_hash = PasswordHandler.hash_password(password_data.new_password)
-    current_user.password_changed_at = datetime.utcnow()
+    user.password_hash = await PasswordHandler.hash_password_async(password_data.new_password)
+    user.password_changed_at = datetime.utcnow()
     
     await db.commit()
+    await UserCache.invalidate(user.id)
     
     # Log password change
     await audit_logger.log_user_action(
@@ -5,18 +5,22 @@ Provides unified API endpoints for the React frontend through the API Gateway.
 """
 
 import asyncio
-from typing import Dict, Any, Optional
-from datetime import datetime
+import time
+from typing import Dict, Any, Optional, List, Tuple
+from typing_extensions import TypedDict
 from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, BackgroundTasks
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from pydantic import BaseModel, Field
+import orjson
 import structlog
 
-from ...gateway import QenergyZBFF, OAuthProvider, OAuthConfig
+from ...gateway import QenergyZBFF, OAuthProvider, OAuthConfig, MicroBatcher
 from ...gateway.bff import BFFRequest, BFFResponse
-from ...gateway.oauth_provider import OAuthProviderHandler, OAuthError
+from ...gateway.oauth_provider import OAuthProviderHandler, OAuthError, OAuthTokenStore
 from ...config import get_settings
+from ..dependencies.auth import JWTHandler, AuthenticationError
+from ..utils.clock import utcnow_iso
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
@@ -26,6 +30,32 @@ security = HTTPBearer()
 bff = QenergyZBFF()
 oauth_handler = OAuthProviderHandler()
 
+# Provider configuration is fixed once the handler is created
+_oauth_provider_names: Tuple[str, ...] = tuple(
+    provider.value for provider in oauth_handler.get_supported_providers()
+)
+
+# Provider list response, encoded once since it cannot change at runtime
+_oauth_providers_body: bytes = orjson.dumps({"providers": _oauth_provider_names})
+
+# Provider lookup by name, without enum construction raising on unknown names
+_PROVIDER_MAP: Dict[str, OAuthProvider] = {provider.value: provider for provider in OAuthProvider}
+
+# Encoded health check body reused for polls within this many seconds
+HEALTH_CACHE_TTL = 1.0
+_health_cache: Optional[Tuple[float, bytes]] = None
+
+# Batches /request calls so identical downstream reads are shared
+microbatcher = MicroBatcher(
+    bff.process_batch,
+    max_batch_size=settings.bff_batch_max_size,
+    max_wait_ms=settings.bff_batch_max_wait_ms
+)
+
+# Issued OAuth tokens and their proactive refresh, set up on startup
+oauth_token_store: Optional[OAuthTokenStore] = None
+_oauth_refresh_task: Optional[asyncio.Task] = None
+
 # API Router
 router = APIRouter(prefix="/api/v1/bff", tags=["BFF Gateway"])
 
@@ -38,6 +68,11 @@ class BFFApiRequest(BaseModel):
     region: str = Field(default="global", description="Regional context")
 
 
+class OAuthProvidersResponse(TypedDict):
+    """Configured OAuth providers"""
+    providers: List[str]
+
+
 class OAuthLoginRequest(BaseModel):
     """OAuth login initiation request"""
     provider: str = Field(..., description="OAuth provider name")
@@ -51,28 +86,54 @@ class OAuthCallbackRequest(BaseModel):
     state: str = Field(..., description="State parameter")
 
 
+def _get_provider(name: str) -> OAuthProvider:
+    """Resolve an OAuth provider name, rejecting unknown names with a 400"""
+    provider = _PROVIDER_MAP.get(name)
+    if provider is None:
+        raise HTTPException(status_code=400, detail=f"Invalid provider: {name}")
+    return provider
+
+
 async def get_current_user_from_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Extract user information from JWT token"""
-    # This is a simplified implementation
-    # In production, you'd validate the JWT token properly
+    # Verified claims are served from the shared token cache on repeat requests
     try:
-        token = credentials.credentials
-        # Decode JWT token and extract user info
-        # For now, return a mock user
-        return {
-            "user_id": "user_123",
-            "username": "test_user",
-            "session_id": "session_456"
-        }
-    except Exception as e:
+        token_data = JWTHandler.verify_token(credentials.credentials)
+    except AuthenticationError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    
+    if token_data.type != "access":
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    
+    return {
+        "user_id": token_data.user_id,
+        "username": token_data.payload.get("email"),
+        "session_id": token_data.payload.get("session_id", "unknown")
+    }
+
+
+async def _oauth_refresh_loop():
+    """Refresh stored OAuth tokens before they expire, off the request path"""
+    while True:
+        await asyncio.sleep(settings.oauth_refresh_interval)
+        try:
+            await oauth_handler.refresh_expiring_tokens(
+                oauth_token_store,
+                within=settings.oauth_refresh_window
+            )
+        except Exception as e:
+            logger.error("OAuth refresh pass failed", error=str(e))
 
 
 @router.on_event("startup")
 async def startup_bff():
     """Initialize BFF service"""
+    global oauth_token_store, _oauth_refresh_task
     try:
         await bff.initialize()
+        microbatcher.start()
+        oauth_token_store = OAuthTokenStore(bff.redis_client)
+        _oauth_refresh_task = asyncio.create_task(_oauth_refresh_loop())
         logger.info("BFF service started successfully")
     except Exception as e:
         logger.error("Failed to initialize BFF service", error=str(e))
@@ -82,6 +143,9 @@ async def startup_bff():
 async def shutdown_bff():
     """Shutdown BFF service"""
     try:
+        if _oauth_refresh_task is not None:
+            _oauth_refresh_task.cancel()
+        await microbatcher.stop()
         await bff.shutdown()
         await oauth_handler.close()
         logger.info("BFF service shut down successfully")
@@ -111,8 +175,8 @@ async def handle_bff_request(
             region=request_data.region
         )
         
-        # Process through BFF
-        response = await bff.process_request(bff_request)
+        # Process through BFF, batched with concurrent requests
+        response = await microbatcher.submit(bff_request)
         
         return response
         
@@ -126,7 +190,7 @@ async def handle_bff_request(
         return BFFResponse(
             success=False,
             error=str(e),
-            request_id=f"error_{datetime.utcnow().timestamp()}"
+            request_id=f"error_{time.time_ns():x}"
         )
 
 
@@ -158,9 +222,9 @@ async def oauth_login(request_data: OAuthLoginRequest) -> Dict[str, str]:
     
     Returns authorization URL for the specified OAuth provider.
     """
+    provider = _get_provider(request_data.provider)
+    
     try:
-        provider = OAuthProvider(request_data.provider)
-        
         result = oauth_handler.get_authorization_url(
             provider=provider,
             redirect_uri=request_data.redirect_uri
@@ -174,8 +238,6 @@ async def oauth_login(request_data: OAuthLoginRequest) -> Dict[str, str]:
             "provider": provider.value
         }
         
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid provider: {request_data.provider}")
     except OAuthError as e:
         logger.error("OAuth login failed", provider=request_data.provider, error=str(e))
         raise HTTPException(status_code=400, detail=str(e))
@@ -191,9 +253,9 @@ async def oauth_callback(request_data: OAuthCallbackRequest) -> Dict[str, Any]:
     
     Exchanges authorization code for tokens and user information.
     """
+    provider = _get_provider(request_data.provider)
+    
     try:
-        provider = OAuthProvider(request_data.provider)
-        
         # Exchange code for token
         oauth_token = await oauth_handler.handle_callback(
             provider=provider,
@@ -204,6 +266,10 @@ async def oauth_callback(request_data: OAuthCallbackRequest) -> Dict[str, Any]:
         # Get user information
         user_info = await oauth_handler.get_user_info(provider, oauth_token)
         
+        # Keep the token so it can be refreshed ahead of expiry
+        if oauth_token_store is not None:
+            await oauth_token_store.save(user_info.id, oauth_token)
+        
         # Here you would typically:
         # 1. Create or update user in your database
         # 2. Generate your application's JWT token
@@ -233,8 +299,6 @@ async def oauth_callback(request_data: OAuthCallbackRequest) -> Dict[str, Any]:
             }
         }
         
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid provider: {request_data.provider}")
     except OAuthError as e:
         logger.error("OAuth callback failed", 
                     provider=request_data.provider, 
@@ -247,41 +311,44 @@ async def oauth_callback(request_data: OAuthCallbackRequest) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/oauth/providers")
-async def get_oauth_providers() -> Dict[str, List[str]]:
+@router.get("/oauth/providers", response_model=OAuthProvidersResponse)
+async def get_oauth_providers() -> Response:
     """Get list of configured OAuth providers"""
-    try:
-        providers = oauth_handler.get_supported_providers()
-        return {
-            "providers": [provider.value for provider in providers]
-        }
-    except Exception as e:
-        logger.error("Failed to get OAuth providers", error=str(e))
-        raise HTTPException(status_code=500, detail="Internal server error")
+    # Returning a Response skips response model validation; the model documents the shape
+    return Response(_oauth_providers_body, media_type="application/json")
 
 
 @router.get("/health")
-async def bff_health_check() -> Dict[str, Any]:
+async def bff_health_check() -> Response:
     """BFF health check endpoint"""
+    global _health_cache
+    
+    now = time.monotonic()
+    if _health_cache is not None and now - _health_cache[0] < HEALTH_CACHE_TTL:
+        return Response(_health_cache[1], media_type="application/json")
+    
     try:
         # Check BFF service status
         # In production, you'd check Redis, database connectivity, etc.
         
-        return {
+        body = {
             "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utcnow_iso(),
             "services": {
                 "bff": "operational",
                 "oauth": "operational",
                 "redis": "operational" if bff.redis_client else "not_configured",
             },
-            "oauth_providers": [p.value for p in oauth_handler.get_supported_providers()]
+            "oauth_providers": _oauth_provider_names
         }
+        content = orjson.dumps(body)
+        _health_cache = (now, content)
+        return Response(content, media_type="application/json")
         
     except Exception as e:
         logger.error("BFF health check failed", error=str(e))
-        return {
+        return ORJSONResponse({
             "status": "unhealthy",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utcnow_iso(),
             "error": str(e)
-        }
\ No newline at end of file
+        })
\ No newline at end of file
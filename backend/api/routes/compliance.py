@@ -5,24 +5,23 @@ Regulatory compliance monitoring and reporting.
 """
 
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies.auth import get_current_active_user, require_admin
+from ..dependencies.auth import get_current_user, require_admin, CachedUser
 from ..dependencies.database import get_db
 from ..dependencies.rate_limiting import api_rate_limit
-from ..models.user import User
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(api_rate_limit)])
 
 
 @router.get("/status")
 async def get_compliance_status(
-    current_user: User = Depends(get_current_active_user),
-    _: None = Depends(api_rate_limit)
+    current_user: CachedUser = Depends(get_current_user)
 ):
     """Get user compliance status"""
     
-    return {
+    return ORJSONResponse({
         "user_id": current_user.id,
         "kyc_status": current_user.kyc_status,
         "region": current_user.region,
@@ -32,34 +31,32 @@ async def get_compliance_status(
             "pep_check": True
         },
         "last_check": "2024-01-01T00:00:00Z"
-    }
+    })
 
 
 @router.post("/check")
 async def run_compliance_check(
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
-    _: None = Depends(api_rate_limit)
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Run compliance checks"""
     
-    return {
+    return ORJSONResponse({
         "message": "Compliance check endpoint - implementation pending",
         "check_id": "pending",
         "status": "running"
-    }
+    })
 
 
 @router.get("/reports")
 async def get_compliance_reports(
-    admin_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
-    _: None = Depends(api_rate_limit)
+    admin_user: CachedUser = Depends(require_admin()),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get compliance reports (admin only)"""
     
-    return {
+    return ORJSONResponse({
         "message": "Compliance reports endpoint - implementation pending",
         "reports": [],
         "total": 0
-    }
\ No newline at end of file
+    })
\ No newline at end of file
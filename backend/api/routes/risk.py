@@ -5,60 +5,57 @@ Risk monitoring, limits, and portfolio risk analysis.
 """
 
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies.auth import get_current_active_user, require_trader, require_admin
+from ..dependencies.auth import get_current_user, require_trader, require_admin, CachedUser
 from ..dependencies.database import get_db
 from ..dependencies.rate_limiting import api_rate_limit
-from ..models.user import User
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(api_rate_limit)])
 
 
 @router.get("/profile")
 async def get_risk_profile(
-    current_user: User = Depends(get_current_active_user),
-    _: None = Depends(api_rate_limit)
+    current_user: CachedUser = Depends(get_current_user)
 ):
     """Get user risk profile"""
     
-    return {
+    return ORJSONResponse({
         "user_id": current_user.id,
         "risk_tolerance": "medium",
         "max_position_size": 1000000.0,
         "daily_var_limit": 10000.0,
         "current_exposure": 0.0,
         "risk_utilization": 0.0
-    }
+    })
 
 
 @router.get("/metrics")
 async def get_risk_metrics(
-    trader: User = Depends(require_trader),
-    db: AsyncSession = Depends(get_db),
-    _: None = Depends(api_rate_limit)
+    trader: CachedUser = Depends(require_trader()),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get portfolio risk metrics"""
     
-    return {
+    return ORJSONResponse({
         "message": "Risk metrics endpoint - implementation pending",
         "var_95": 0.0,
         "expected_shortfall": 0.0,
         "beta": 1.0,
         "volatility": 0.0,
         "sharpe_ratio": 0.0
-    }
+    })
 
 
 @router.get("/alerts")
 async def get_risk_alerts(
-    admin_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
-    _: None = Depends(api_rate_limit)
+    admin_user: CachedUser = Depends(require_admin()),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get risk alerts (admin only)"""
     
-    return {
+    return ORJSONResponse({
         "message": "Risk alerts endpoint - implementation pending",
         "alerts": [],
         "total": 0,
@@ -68,4 +65,4 @@ async def get_risk_alerts(
             "high": 0,
             "critical": 0
         }
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -5,57 +5,57 @@ Energy trading operations, order management, and portfolio tracking.
 """
 
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies.auth import get_current_active_user, require_trader
+from ..dependencies.auth import require_trader, CachedUser
 from ..dependencies.database import get_db
 from ..dependencies.rate_limiting import trading_rate_limit
-from ..models.user import User
 
 router = APIRouter()
 
 
 @router.get("/positions")
 async def get_positions(
-    trader: User = Depends(require_trader),
+    trader: CachedUser = Depends(require_trader()),
     db: AsyncSession = Depends(get_db),
     _: None = Depends(trading_rate_limit)
 ):
     """Get trading positions"""
     
-    return {
+    return ORJSONResponse({
         "message": "Trading positions endpoint - implementation pending",
         "positions": [],
         "total_value": 0.0,
         "unrealized_pnl": 0.0
-    }
+    })
 
 
 @router.post("/orders")
 async def create_order(
-    trader: User = Depends(require_trader),
+    trader: CachedUser = Depends(require_trader()),
     db: AsyncSession = Depends(get_db),
     _: None = Depends(trading_rate_limit)
 ):
     """Create new trading order"""
     
-    return {
+    return ORJSONResponse({
         "message": "Create order endpoint - implementation pending",
         "order_id": "pending",
         "status": "pending"
-    }
+    })
 
 
 @router.get("/orders")
 async def get_orders(
-    trader: User = Depends(require_trader),
+    trader: CachedUser = Depends(require_trader()),
     db: AsyncSession = Depends(get_db),
     _: None = Depends(trading_rate_limit)
 ):
     """Get trading orders"""
     
-    return {
+    return ORJSONResponse({
         "message": "Trading orders endpoint - implementation pending",
         "orders": [],
         "total": 0
-    }
\ No newline at end of file
+    })
\ No newline at end of file
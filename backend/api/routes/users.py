@@ -5,25 +5,26 @@ User profile, role management, and administrative operations.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
-from ..dependencies.auth import get_current_active_user, require_admin
-from ..dependencies.database import get_db
+from ..dependencies.auth import get_current_user, require_admin, CachedUser
+from ..dependencies.database import stream_ndjson
 from ..dependencies.rate_limiting import api_rate_limit
+from ..dependencies.validation import PaginationValidator
 from ..models.user import User
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(api_rate_limit)])
 
 
 @router.get("/profile")
 async def get_user_profile(
-    current_user: User = Depends(get_current_active_user),
-    _: None = Depends(api_rate_limit)
+    current_user: CachedUser = Depends(get_current_user)
 ):
     """Get user profile information"""
     
-    return {
+    return ORJSONResponse({
         "id": current_user.id,
         "email": current_user.email,
         "first_name": current_user.first_name,
@@ -36,22 +37,30 @@ async def get_user_profile(
         "is_verified": current_user.is_verified,
         "last_login_at": current_user.last_login_at,
         "created_at": current_user.created_at
-    }
+    })
 
 
 @router.get("/list")
 async def list_users(
-    admin_user: User = Depends(require_admin),
-    db: AsyncSession = Depends(get_db),
-    _: None = Depends(api_rate_limit)
+    pagination: PaginationValidator = Depends(),
+    admin_user: CachedUser = Depends(require_admin())
 ):
-    """List all users (admin only)"""
+    """List users one JSON object per line (admin only)"""
     
-    # This is a stub - implement pagination and filtering
-    return {
-        "message": "User list endpoint - implementation pending",
-        "users": [],
-        "total": 0,
-        "page": 1,
-        "size": 20
-    }
\ No newline at end of file
+    stmt = (
+        select(
+            User.id,
+            User.email,
+            User.first_name,
+            User.last_name,
+            User.role,
+            User.is_active,
+            User.is_verified,
+            User.created_at
+        )
+        .order_by(User.created_at, User.id)
+        .offset(pagination.offset)
+        .limit(pagination.limit)
+    )
+    
+    return StreamingResponse(stream_ndjson(stmt), media_type="application/x-ndjson")
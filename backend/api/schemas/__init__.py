@@ -7,7 +7,7 @@ Pydantic models for API request/response validation.
 # Import common schemas
 from .auth import TokenResponse, UserLogin, UserRegister, PasswordChange
 from .user import UserProfile, UserUpdate, UserList
-from .common import PaginationParams, BaseResponse, ErrorResponse
+from .common import PaginationParams, BaseResponse, ErrorResponse, Password, PersonName
 
 __all__ = [
     "TokenResponse",
@@ -20,4 +20,6 @@ __all__ = [
     "PaginationParams",
     "BaseResponse",
     "ErrorResponse",
+    "Password",
+    "PersonName",
 ]
\ No newline at end of file
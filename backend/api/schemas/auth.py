@@ -8,6 +8,8 @@ from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field
 
+from .common import Password, PersonName
+
 
 class TokenResponse(BaseModel):
     """JWT token response"""
@@ -21,15 +23,15 @@ class TokenResponse(BaseModel):
 class UserLogin(BaseModel):
     """User login request"""
     email: EmailStr
-    password: str = Field(..., min_length=8, max_length=128)
+    password: Password
 
 
 class UserRegister(BaseModel):
     """User registration request"""
     email: EmailStr
-    password: str = Field(..., min_length=8, max_length=128)
-    first_name: str = Field(..., min_length=1, max_length=100)
-    last_name: str = Field(..., min_length=1, max_length=100)
+    password: Password
+    first_name: PersonName
+    last_name: PersonName
     phone: Optional[str] = Field(None, max_length=20)
     company: Optional[str] = Field(None, max_length=200)
     job_title: Optional[str] = Field(None, max_length=100)
@@ -37,8 +39,8 @@ class UserRegister(BaseModel):
 
 class PasswordChange(BaseModel):
     """Password change request"""
-    current_password: str = Field(..., min_length=8, max_length=128)
-    new_password: str = Field(..., min_length=8, max_length=128)
+    current_password: Password
+    new_password: Password
 
 
 class PasswordReset(BaseModel):
@@ -49,7 +51,7 @@ class PasswordReset(BaseModel):
 class PasswordResetConfirm(BaseModel):
     """Password reset confirmation"""
     token: str
-    new_password: str = Field(..., min_length=8, max_length=128)
+    new_password: Password
 
 
 class TokenData(BaseModel):
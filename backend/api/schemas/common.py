@@ -4,10 +4,15 @@ Common Schemas
 Shared Pydantic models for API requests and responses.
 """
 
-from typing import Optional, Any, Dict, List
+from typing import Annotated, Optional, Any, Dict, List
 from pydantic import BaseModel, Field
 
 
+# Shared constrained field types
+Password = Annotated[str, Field(min_length=8, max_length=128)]
+PersonName = Annotated[str, Field(min_length=1, max_length=100)]
+
+
 class PaginationParams(BaseModel):
     """Pagination parameters"""
     page: int = Field(1, ge=1, le=1000, description="Page number")
@@ -6,11 +6,15 @@ Pydantic models for user management.
 
 from typing import Optional, List
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+
+from .common import Password, PersonName
 
 
 class UserProfile(BaseModel):
     """User profile information"""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: str
     email: str
     first_name: str
@@ -26,14 +30,11 @@ class UserProfile(BaseModel):
     last_login_at: Optional[datetime] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class UserUpdate(BaseModel):
     """User profile update"""
-    first_name: Optional[str] = Field(None, min_length=1, max_length=100)
-    last_name: Optional[str] = Field(None, min_length=1, max_length=100)
+    first_name: Optional[PersonName] = None
+    last_name: Optional[PersonName] = None
     phone: Optional[str] = Field(None, max_length=20)
     company: Optional[str] = Field(None, max_length=200)
     job_title: Optional[str] = Field(None, max_length=100)
@@ -54,9 +55,9 @@ class UserList(BaseModel):
 class UserCreate(BaseModel):
     """Admin user creation"""
     email: EmailStr
-    password: str = Field(..., min_length=8, max_length=128)
-    first_name: str = Field(..., min_length=1, max_length=100)
-    last_name: str = Field(..., min_length=1, max_length=100)
+    password: Password
+    first_name: PersonName
+    last_name: PersonName
     role: str = Field(default="user")
     phone: Optional[str] = Field(None, max_length=20)
     company: Optional[str] = Field(None, max_length=200)
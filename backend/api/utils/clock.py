@@ -0,0 +1,32 @@
+"""
+Clock Utilities
+
+Low-allocation timestamp helpers for logging hot paths.
+"""
+
+import time
+from typing import Tuple
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS." prefix) for the most recent second seen
+_second_prefix: Tuple[int, str] = (-1, "")
+
+
+def utcnow_iso() -> str:
+    """Current UTC time as ``YYYY-MM-DDTHH:MM:SS.ffffff``.
+
+    Unlike ``datetime.utcnow().isoformat()``, the microseconds are always
+    present, so the string has a fixed width.
+
+    The date/time prefix is formatted once per second and reused, so most
+    calls only format the microsecond suffix.
+    """
+    global _second_prefix
+    
+    second, remainder = divmod(time.time_ns(), 1_000_000_000)
+    cached_second, prefix = _second_prefix
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S.", time.gmtime(second))
+        _second_prefix = (second, prefix)
+    
+    return f"{prefix}{remainder // 1000:06d}"
@@ -6,9 +6,13 @@ Application settings and environment configuration.
 
 import os
 from functools import lru_cache
-from typing import Optional
-from pydantic_settings import BaseSettings
-from pydantic import Field
+from typing import Annotated, Any, Optional, Tuple
+from pydantic_settings import BaseSettings, NoDecode
+from pydantic import Field, field_validator
+import orjson
+
+# Comma-separated (or JSON array) env values, split once when settings load
+StrTuple = Annotated[Tuple[str, ...], NoDecode]
 
 
 class Settings(BaseSettings):
@@ -25,40 +29,75 @@ class Settings(BaseSettings):
     encryption_key: Optional[str] = Field(None, env="ENCRYPTION_KEY")
     jwt_algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     jwt_expiration_hours: int = Field(default=24, env="JWT_EXPIRATION_HOURS")
+    jwt_cache_ttl: float = Field(default=30.0, env="JWT_CACHE_TTL")
+    jwt_cache_max_entries: int = Field(default=10000, env="JWT_CACHE_MAX_ENTRIES")
     
     # Database Configuration
     database_url: str = Field(..., env="DATABASE_URL")
     test_database_url: Optional[str] = Field(None, env="TEST_DATABASE_URL")
     database_pool_size: int = Field(default=20, env="DATABASE_POOL_SIZE")
     database_max_overflow: int = Field(default=10, env="DATABASE_MAX_OVERFLOW")
+    database_pool_timeout: int = Field(default=30, env="DATABASE_POOL_TIMEOUT")
+    database_pool_recycle: int = Field(default=3600, env="DATABASE_POOL_RECYCLE")
+    database_pool_pre_ping: bool = Field(default=True, env="DATABASE_POOL_PRE_PING")
     query_timeout: int = Field(default=30, env="QUERY_TIMEOUT")
     
     # Cache Configuration
     redis_url: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
+    redis_max_connections: int = Field(default=64, env="REDIS_MAX_CONNECTIONS")
     cache_ttl: int = Field(default=3600, env="CACHE_TTL")
+    user_cache_ttl: int = Field(default=60, env="USER_CACHE_TTL")
     
     # Rate Limiting
     rate_limit_per_minute: int = Field(default=60, env="RATE_LIMIT_PER_MINUTE")
     rate_limit_per_hour: int = Field(default=3600, env="RATE_LIMIT_PER_HOUR")
     
     # CORS Settings
-    cors_origins: list = Field(default=["*"], env="CORS_ORIGINS")
+    cors_origins: StrTuple = Field(default=("*",), env="CORS_ORIGINS")
     cors_credentials: bool = Field(default=True, env="CORS_CREDENTIALS")
-    cors_methods: list = Field(default=["*"], env="CORS_METHODS")
-    cors_headers: list = Field(default=["*"], env="CORS_HEADERS")
+    cors_methods: StrTuple = Field(default=("*",), env="CORS_METHODS")
+    cors_headers: StrTuple = Field(default=("*",), env="CORS_HEADERS")
     
     # Security
-    allowed_hosts: list = Field(default=["*"], env="ALLOWED_HOSTS")
+    allowed_hosts: StrTuple = Field(default=("*",), env="ALLOWED_HOSTS")
+    trust_proxy: bool = Field(default=False, env="TRUST_PROXY")
+    
+    # Logging
+    log_queue_size: int = Field(default=10000, env="LOG_QUEUE_SIZE")
+    log_skip_paths: StrTuple = Field(
+        default=("/health", "/healthz", "/metrics", "/favicon.ico", "/robots.txt"),
+        env="LOG_SKIP_PATHS"
+    )
+    
+    # Audit
+    audit_log_file: Optional[str] = Field(None, env="AUDIT_LOG_FILE")
+    audit_batch_size: int = Field(default=100, env="AUDIT_BATCH_SIZE")
+    audit_flush_interval: float = Field(default=0.05, env="AUDIT_FLUSH_INTERVAL")
+    audit_queue_size: int = Field(default=10000, env="AUDIT_QUEUE_SIZE")
     
     # Monitoring
     sentry_dsn: Optional[str] = Field(None, env="SENTRY_DSN")
     
+    @field_validator(
+        "cors_origins", "cors_methods", "cors_headers", "allowed_hosts", "log_skip_paths",
+        mode="before"
+    )
+    @classmethod
+    def split_str_tuple(cls, value: Any) -> Any:
+        """Accept "a,b" or a JSON array from the environment"""
+        if isinstance(value, str):
+            value = value.strip()
+            if value.startswith("["):
+                return orjson.loads(value)
+            return tuple(item.strip() for item in value.split(",") if item.strip())
+        return value
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
 
 
-@lru_cache()
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get cached application settings"""
     return Settings()
\ No newline at end of file
@@ -15,11 +15,12 @@ logger = structlog.get_logger(__name__)
 
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions"""
+    url = request.url
     logger.error(
         "HTTP exception",
         status_code=exc.status_code,
         detail=exc.detail,
-        url=str(request.url),
+        url=str(url),
         method=request.method
     )
     
@@ -28,16 +29,18 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content={
             "error": exc.detail,
             "status_code": exc.status_code,
-            "path": str(request.url.path)
-        }
+            "path": url.path
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors"""
+    errors = exc.errors()
     logger.warning(
         "Validation error",
-        errors=exc.errors(),
+        errors=errors,
         url=str(request.url),
         method=request.method
     )
@@ -47,20 +50,21 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={
             "error": "Validation error",
             "status_code": 422,
-            "details": exc.errors()
+            "details": errors
         }
     )
 
 
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected errors"""
+    url = request.url
     logger.error(
         "Unexpected error",
         error=str(exc),
         error_type=type(exc).__name__,
-        url=str(request.url),
+        url=str(url),
         method=request.method,
-        exc_info=True
+        exc_info=exc  # Traceback is rendered by the log listener thread
     )
     
     return JSONResponse(
@@ -68,7 +72,7 @@ async def general_exception_handler(request: Request, exc: Exception):
         content={
             "error": "Internal server error",
             "status_code": 500,
-            "path": str(request.url.path)
+            "path": url.path
         }
     )
 
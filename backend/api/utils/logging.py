@@ -4,17 +4,100 @@ Logging Configuration
 Setup structured logging for the application.
 """
 
+import io
 import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+import orjson
 import structlog
 from .config import get_settings
 
 settings = get_settings()
 
+# Background listener that renders and writes queued log records
+_log_listener: Optional["DrainingQueueListener"] = None
+
+
+def orjson_dumps(obj, default=None, **kwargs) -> str:
+    """orjson-backed drop-in for json.dumps used by structlog and SQLAlchemy"""
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def capture_exc_info(logger, method_name, event_dict):
+    """Resolve exc_info=True on the calling thread so rendering can happen elsewhere"""
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted
+
+    The stdlib handler formats each record before queueing it; here the
+    structlog event dict is passed through as-is and rendered by the
+    listener thread instead. When the queue is full the record is dropped
+    and counted rather than blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that flushes only once its source queue is drained
+
+    Records rendered back-to-back by the listener accumulate in the stream
+    buffer and reach the file descriptor in a single write.
+    """
+
+    def __init__(self, stream, source: queue.Queue):
+        super().__init__(stream)
+        self.source = source
+
+    def flush(self):
+        if self.source.empty():
+            super().flush()
+
+    def close(self):
+        super().flush()
+        super().close()
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop waits for room in a full queue instead of failing"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def _open_log_stream():
+    """Block-buffered writer on stderr's descriptor, or stderr itself if it has none"""
+    try:
+        fd = sys.stderr.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return sys.stderr
+    return open(fd, "w", buffering=1 << 16, encoding="utf-8", closefd=False)
+
 
 def setup_logging():
     """Setup structured logging"""
+    global _log_listener
     
-    # Configure structlog
+    # Configure structlog; only cheap enrichment runs on the calling thread
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
@@ -23,9 +106,8 @@ def setup_logging():
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            capture_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -33,8 +115,43 @@ def setup_logging():
         cache_logger_on_first_use=True,
     )
     
+    shutdown_logging()
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    
+    # Tracebacks and JSON are rendered by the listener thread, writes are batched
+    stream_handler = BatchingStreamHandler(_open_log_stream(), log_queue)
+    stream_handler.setFormatter(structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            # Objects orjson cannot encode natively (e.g. URLs) are logged as str()
+            structlog.processors.JSONRenderer(serializer=orjson_dumps, default=str)
+        ],
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+        ]
+    ))
+    
     # Configure Python logging
-    logging.basicConfig(
-        level=logging.DEBUG if settings.debug else logging.INFO,
-        format="%(message)s"
-    )
\ No newline at end of file
+    root_logger = logging.getLogger()
+    root_logger.handlers = [DeferredQueueHandler(log_queue)]
+    root_logger.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+    
+    _log_listener = DrainingQueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _log_listener.start()
+
+
+def shutdown_logging():
+    """Stop the log listener after writing any queued records"""
+    global _log_listener
+    
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
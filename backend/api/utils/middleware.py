@@ -4,26 +4,52 @@ Middleware Configuration
 Security and request processing middleware.
 """
 
+import re
 import time
+from typing import Iterable, Optional, Tuple
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 import structlog
 
+from ..dependencies.auth import JWTHandler, AuthenticationError
 from .config import get_settings
+from .request_meta import capture_request_meta
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
 
+# Probe and static paths passed through without auth parsing, timing or logging
+_SKIP_PATHS = frozenset(settings.log_skip_paths)
+
+
+def _cors_origin_rules(origins: Iterable[str]) -> Tuple[frozenset, Optional[str]]:
+    """
+    Split configured CORS origins into an exact-match set and a wildcard regex
+    
+    Entries such as ``https://*.example.com`` match a single subdomain label;
+    they are combined into one pattern that CORSMiddleware compiles once.
+    """
+    exact = set()
+    patterns = []
+    for origin in origins:
+        if origin == "*" or "*" not in origin:
+            exact.add(origin)
+        else:
+            patterns.append(re.escape(origin).replace(r"\*", r"[^./:]+"))
+    return frozenset(exact), "|".join(patterns) or None
+
 
 def setup_middleware(app: FastAPI):
     """Setup application middleware"""
     
-    # CORS middleware
+    # CORS middleware; exact origins are checked with a set lookup per request
+    allow_origins, allow_origin_regex = _cors_origin_rules(settings.cors_origins)
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=settings.cors_origins,
+        allow_origins=allow_origins,
+        allow_origin_regex=allow_origin_regex,
         allow_credentials=settings.cors_credentials,
         allow_methods=settings.cors_methods,
         allow_headers=settings.cors_headers,
@@ -43,33 +69,36 @@ def setup_middleware(app: FastAPI):
     @app.middleware("http")
     async def log_requests(request: Request, call_next):
         """Log HTTP requests"""
-        start_time = time.time()
+        if request.scope["path"] in _SKIP_PATHS:
+            return await call_next(request)
+        
+        start_ns = time.perf_counter_ns()
+        authorization = capture_request_meta(request)
         
-        # Get user info if available
+        # Get user info if available; repeat tokens are served from the verification cache
         user_id = None
-        try:
-            auth_header = request.headers.get("authorization", "")
-            if auth_header.startswith("Bearer "):
-                from ..dependencies.auth import JWTHandler
-                token = auth_header.split(" ")[1]
-                token_data = JWTHandler.verify_token(token)
-                user_id = token_data.user_id
-        except:
-            pass
+        scheme, _, token = authorization.partition(" ")
+        if scheme == "Bearer" and token:
+            try:
+                user_id = JWTHandler.verify_token(token).user_id
+            except AuthenticationError:
+                pass
         
         response = await call_next(request)
         
-        process_time = time.time() - start_time
+        # Milliseconds to two decimals, without float rounding
+        process_time = ((time.perf_counter_ns() - start_ns) // 10_000) / 100
         
+        # The URL object is stringified when the log listener renders the event
         logger.info(
             "HTTP request",
             method=request.method,
-            url=str(request.url),
+            url=request.url,
             status_code=response.status_code,
-            process_time=round(process_time * 1000, 2),
+            process_time=process_time,
             user_id=user_id,
-            user_agent=request.headers.get("user-agent", "unknown"),
-            client_ip=request.client.host if request.client else "unknown"
+            user_agent=request.state.user_agent,
+            client_ip=request.state.client_host
         )
         
         return response
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Request Metadata
+
+Per-request client metadata captured once and shared by loggers.
+"""
+
+from typing import Optional
+from fastapi import Request
+
+
+def capture_request_meta(request: Request) -> str:
+    """
+    Resolve client host and user agent once and store them on request.state
+    
+    Reads the raw ASGI scope in a single pass over the headers and returns
+    the Authorization header found along the way, or an empty string.
+    """
+    scope = request.scope
+    client = scope.get("client")
+    user_agent = authorization = None
+    for name, value in scope["headers"]:
+        if name == b"user-agent":
+            if user_agent is None:
+                user_agent = value
+        elif name == b"authorization":
+            if authorization is None:
+                authorization = value
+        else:
+            continue
+        if user_agent is not None and authorization is not None:
+            break
+    
+    request.state.client_host = client[0] if client else "unknown"
+    request.state.user_agent = user_agent.decode("latin-1") if user_agent is not None else "unknown"
+    return authorization.decode("latin-1") if authorization is not None else ""
+
+
+def get_client_host(request: Optional[Request]) -> str:
+    """Client IP address for the request, or "unknown" """
+    if request is None:
+        return "unknown"
+    client_host = getattr(request.state, "client_host", None)
+    if client_host is None:
+        capture_request_meta(request)
+        client_host = request.state.client_host
+    return client_host
+
+
+def get_user_agent(request: Optional[Request]) -> str:
+    """User agent for the request, or "unknown" """
+    if request is None:
+        return "unknown"
+    user_agent = getattr(request.state, "user_agent", None)
+    if user_agent is None:
+        capture_request_meta(request)
+        user_agent = request.state.user_agent
+    return user_agent
@@ -9,141 +9,119 @@ import asyncio
 import sys
 import os
 from pathlib import Path
+from typing import List
 
 # Add the backend directory to Python path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
+from sqlalchemy import select
+
 from api.models.database import AsyncSessionLocal, init_database
 from api.models.user import User, UserRole
 from api.dependencies.auth import PasswordHandler
+from api.dependencies.database import insert_ignoring_conflicts
 from api.utils.config import get_settings
 import structlog
 
 logger = structlog.get_logger(__name__)
 
 
-async def create_admin_user():
-    """Create default admin user"""
+# Default accounts; the admin comes first
+SEED_USERS = [
+    {
+        "email": "admin@qenergyz.com",
+        "password": "AdminPassword123!",
+        "first_name": "System",
+        "last_name": "Administrator",
+        "role": UserRole.SUPER_ADMIN,
+        "company": "Qenergyz",
+        "job_title": "System Administrator"
+    },
+    {
+        "email": "trader@qenergyz.com",
+        "password": "TraderPassword123!",
+        "first_name": "John",
+        "last_name": "Trader", 
+        "role": UserRole.TRADER,
+        "company": "Qenergyz Trading",
+        "job_title": "Senior Energy Trader"
+    },
+    {
+        "email": "manager@qenergyz.com", 
+        "password": "ManagerPassword123!",
+        "first_name": "Sarah",
+        "last_name": "Manager",
+        "role": UserRole.MANAGER,
+        "company": "Qenergyz Management",
+        "job_title": "Trading Manager"
+    },
+    {
+        "email": "user@qenergyz.com",
+        "password": "UserPassword123!",
+        "first_name": "Mike",
+        "last_name": "User",
+        "role": UserRole.USER,
+        "company": "Qenergyz Corp",
+        "job_title": "Energy Analyst"
+    }
+]
+
+
+async def create_seed_users() -> List[str]:
+    """Create missing seed users in one bulk insert, returning the created emails"""
     async with AsyncSessionLocal() as session:
         try:
-            # Check if admin user already exists
-            from sqlalchemy import select
+            # One lookup for all seed accounts, so passwords are only hashed for new users
             result = await session.execute(
-                select(User).where(User.email == "admin@qenergyz.com")
+                select(User.email).where(User.email.in_([u["email"] for u in SEED_USERS]))
             )
-            existing_admin = result.scalar_one_or_none()
+            existing = set(result.scalars())
+            if existing:
+                logger.info("Seed users already exist", emails=sorted(existing))
             
-            if existing_admin:
-                logger.info("Admin user already exists")
-                return existing_admin
+            new_users = [u for u in SEED_USERS if u["email"] not in existing]
+            if not new_users:
+                return []
             
-            # Create admin user
-            admin_user = User(
-                email="admin@qenergyz.com",
-                password_hash=PasswordHandler.hash_password("AdminPassword123!"),
-                first_name="System",
-                last_name="Administrator",
-                role=UserRole.SUPER_ADMIN,
-                is_active=True,
-                is_verified=True,
-                company="Qenergyz",
-                job_title="System Administrator",
-                region="middle_east",
-                kyc_status="approved"
-            )
+            # Hash concurrently in worker threads; the KDF releases the GIL
+            password_hashes = await asyncio.gather(*(
+                PasswordHandler.hash_password_async(user_data["password"])
+                for user_data in new_users
+            ))
             
-            session.add(admin_user)
+            rows = [
+                {
+                    "email": user_data["email"],
+                    "password_hash": password_hash,
+                    "first_name": user_data["first_name"],
+                    "last_name": user_data["last_name"],
+                    "role": user_data["role"],
+                    "is_active": True,
+                    "is_verified": True,
+                    "company": user_data["company"],
+                    "job_title": user_data["job_title"],
+                    "region": "middle_east",
+                    "kyc_status": "approved" if user_data["role"] != UserRole.USER else "pending"
+                }
+                for user_data, password_hash in zip(new_users, password_hashes)
+            ]
+            
+            # Single statement; concurrent seeding skips rows created in the meantime
+            created = await insert_ignoring_conflicts(
+                session, User, rows, conflict_column=User.email, returning=User.email
+            )
             await session.commit()
-            await session.refresh(admin_user)
             
-            logger.info("Admin user created successfully", user_id=admin_user.id)
-            return admin_user
+            logger.info("Seed users created", emails=created)
+            return created
             
         except Exception as e:
             await session.rollback()
-            logger.error("Failed to create admin user", error=str(e))
+            logger.error("Failed to create seed users", error=str(e))
             raise
 
 
-async def create_demo_users():
-    """Create demo users for development"""
-    demo_users_data = [
-        {
-            "email": "trader@qenergyz.com",
-            "password": "TraderPassword123!",
-            "first_name": "John",
-            "last_name": "Trader", 
-            "role": UserRole.TRADER,
-            "company": "Qenergyz Trading",
-            "job_title": "Senior Energy Trader"
-        },
-        {
-            "email": "manager@qenergyz.com", 
-            "password": "ManagerPassword123!",
-            "first_name": "Sarah",
-            "last_name": "Manager",
-            "role": UserRole.MANAGER,
-            "company": "Qenergyz Management",
-            "job_title": "Trading Manager"
-        },
-        {
-            "email": "user@qenergyz.com",
-            "password": "UserPassword123!",
-            "first_name": "Mike",
-            "last_name": "User",
-            "role": UserRole.USER,
-            "company": "Qenergyz Corp",
-            "job_title": "Energy Analyst"
-        }
-    ]
-    
-    async with AsyncSessionLocal() as session:
-        created_users = []
-        
-        for user_data in demo_users_data:
-            try:
-                # Check if user already exists
-                from sqlalchemy import select
-                result = await session.execute(
-                    select(User).where(User.email == user_data["email"])
-                )
-                existing_user = result.scalar_one_or_none()
-                
-                if existing_user:
-                    logger.info("Demo user already exists", email=user_data["email"])
-                    continue
-                
-                # Create demo user
-                demo_user = User(
-                    email=user_data["email"],
-                    password_hash=PasswordHandler.hash_password(user_data["password"]),
-                    first_name=user_data["first_name"],
-                    last_name=user_data["last_name"],
-                    role=user_data["role"],
-                    is_active=True,
-                    is_verified=True,
-                    company=user_data["company"],
-                    job_title=user_data["job_title"],
-                    region="middle_east",
-                    kyc_status="approved" if user_data["role"] != UserRole.USER else "pending"
-                )
-                
-                session.add(demo_user)
-                created_users.append(demo_user)
-                
-                logger.info("Demo user created", email=user_data["email"], role=user_data["role"].value)
-                
-            except Exception as e:
-                logger.error("Failed to create demo user", email=user_data["email"], error=str(e))
-        
-        if created_users:
-            await session.commit()
-            logger.info(f"Created {len(created_users)} demo users")
-        
-        return created_users
-
-
 async def main():
     """Main seed function"""
     try:
@@ -153,16 +131,13 @@ async def main():
         await init_database()
         logger.info("Database initialized")
         
-        # Create admin user
-        admin = await create_admin_user()
-        
-        # Create demo users
-        demo_users = await create_demo_users()
+        # Create admin and demo users
+        created = await create_seed_users()
         
         logger.info(
             "Database seeding completed successfully",
-            admin_created=bool(admin),
-            demo_users_created=len(demo_users)
+            admin_created=SEED_USERS[0]["email"] in created,
+            demo_users_created=len([email for email in created if email != SEED_USERS[0]["email"]])
         )
         
         print("\n✅ Database seeding completed!")
@@ -11,6 +11,7 @@ between the React frontend and backend services with:
 """
 
 from .bff import QenergyZBFF
+from .microbatcher import MicroBatcher
 from .rate_limiter import RateLimiter, RateLimitConfig
 from .circuit_breaker import CircuitBreaker, CircuitBreakerConfig
 from .oauth_provider import OAuthProvider, OAuthConfig
@@ -19,6 +20,7 @@ from .audit_logger import AuditLogger
 
 __all__ = [
     "QenergyZBFF",
+    "MicroBatcher",
     "RateLimiter", 
     "RateLimitConfig",
     "CircuitBreaker",
@@ -10,23 +10,61 @@ Provides detailed audit logging for:
 """
 
 import asyncio
-import json
 import hashlib
+import heapq
+import itertools
+import os
 import secrets
+from collections import deque
+from functools import cached_property
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 from enum import Enum
+import orjson
 import structlog
 import redis.asyncio as aioredis
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select, insert
+from sqlalchemy import text, select, insert, MetaData, Table, Column, String, Text, DateTime
 
 from ..config import get_settings
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
 
+# Event ids are unique per process seed plus a counter, avoiding a urandom read per event
+_event_id_seed = secrets.token_hex(4)
+_event_id_counter = itertools.count()
+
+
+def _reseed_event_ids():
+    """Give forked workers their own id seed so they never repeat the parent's ids"""
+    global _event_id_seed, _event_id_counter
+    _event_id_seed = secrets.token_hex(4)
+    _event_id_counter = itertools.count()
+
+
+os.register_at_fork(after_in_child=_reseed_event_ids)
+
+# Core table for batched audit inserts; the schema itself is managed outside this module
+audit_logs_table = Table(
+    "audit_logs",
+    MetaData(),
+    Column("id", String, primary_key=True),
+    Column("timestamp", DateTime),
+    Column("event_type", String),
+    Column("severity", String),
+    Column("outcome", String),
+    Column("user_id", String),
+    Column("session_id", String),
+    Column("request_id", String),
+    Column("client_ip", String),
+    Column("description", Text),
+    Column("details", Text),
+    Column("region", String),
+    Column("event_hash", String),
+)
+
 
 class AuditEventType(str, Enum):
     """Types of audit events"""
@@ -146,6 +184,15 @@ class AuditEvent(BaseModel):
     correlation_id: Optional[str] = None
     parent_event_id: Optional[str] = None
     
+    # Case-folded text matched by AuditFilter.search_text, built on first search
+    _search_blob: Optional[str] = PrivateAttr(default=None)
+    
+    def search_blob(self) -> str:
+        """Description and details as one case-folded string for text search"""
+        if self._search_blob is None:
+            self._search_blob = f"{self.description}\n{self.details}".casefold()
+        return self._search_blob
+    
     def generate_event_hash(self) -> str:
         """Generate hash for event integrity"""
         hash_data = f"{self.timestamp}{self.event_type}{self.user_id}{self.description}"
@@ -166,6 +213,11 @@ class AuditFilter(BaseModel):
     search_text: Optional[str] = None
     limit: int = Field(default=100, le=1000)
     offset: int = Field(default=0, ge=0)
+    
+    @cached_property
+    def search_needle(self) -> Optional[str]:
+        """Case-folded search text, computed once per search"""
+        return self.search_text.casefold() if self.search_text else None
 
 
 class ComplianceReportConfig(BaseModel):
@@ -183,7 +235,8 @@ class AuditLogger:
     Comprehensive audit logging system
     
     Provides secure, tamper-evident audit logging with:
-    - Multiple storage backends (Redis, Database)
+    - Multiple storage backends (Redis, Database), written in batches by a
+      background task so callers never wait on storage round trips
     - Real-time alerting for critical events
     - Compliance reporting
     - Event correlation and analysis
@@ -192,12 +245,22 @@ class AuditLogger:
     def __init__(
         self, 
         redis_client: Optional[aioredis.Redis] = None,
-        db_session: Optional[AsyncSession] = None
+        db_session: Optional[AsyncSession] = None,
+        batch_size: int = 100,
+        flush_interval: float = 0.005,
+        max_queue_size: int = 10000
     ):
         self.redis_client = redis_client
         self.db_session = db_session
-        self._local_buffer: List[AuditEvent] = []
         self._buffer_size = 100
+        self._local_buffer: "deque[AuditEvent]" = deque(maxlen=self._buffer_size)
+        
+        # Events waiting for the background writer; None asks it to stop
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "asyncio.Queue[Optional[AuditEvent]]" = asyncio.Queue(maxsize=max_queue_size)
+        self._writer_task: Optional[asyncio.Task] = None
+        self.backpressure_waits = 0
         
         # Event correlation tracking
         self._correlations: Dict[str, List[str]] = {}
@@ -219,8 +282,22 @@ class AuditLogger:
         if db_session:
             self.db_session = db_session
         
+        self.start()
         logger.info("Audit logger initialized")
     
+    def start(self):
+        """Start the background writer if it is not running"""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._drain())
+    
+    async def shutdown(self):
+        """Write queued events and stop the background writer"""
+        if self._writer_task is None or self._writer_task.done():
+            return
+        await self._queue.put(None)
+        await self._writer_task
+        self._writer_task = None
+    
     async def log_event(
         self, 
         event_type: AuditEventType,
@@ -253,17 +330,21 @@ class AuditLogger:
         )
         
         # Generate unique event ID
-        event.id = f"{event_type.value}_{datetime.utcnow().timestamp()}_{secrets.token_hex(8)}"
+        event.id = (
+            f"{event_type.value}_{event.timestamp.timestamp()}_"
+            f"{_event_id_seed}{next(_event_id_counter):08x}"
+        )
         
-        # Add event hash for integrity
-        event_hash = event.generate_event_hash()
-        event.details["event_hash"] = event_hash
+        # Check for real-time alerting; alerts carry the integrity hash, so
+        # critical events are hashed now rather than by the background writer
+        critical = event.event_type in self.critical_event_types or event.severity == AuditSeverity.CRITICAL
+        if critical:
+            event.details["event_hash"] = event.generate_event_hash()
         
-        # Store event
-        await self._store_event(event)
+        # Queue for storage; the background writer persists it with its batch
+        await self._enqueue(event)
         
-        # Check for real-time alerting
-        if event.event_type in self.critical_event_types or event.severity == AuditSeverity.CRITICAL:
+        if critical:
             await self._send_critical_alert(event)
         
         # Update correlations
@@ -277,107 +358,139 @@ class AuditLogger:
         
         return event.id
     
-    async def _store_event(self, event: AuditEvent):
-        """Store event in configured backends"""
+    async def _enqueue(self, event: AuditEvent):
+        """Hand an event to the background writer and the local fallback buffer"""
+        self.start()
+        
+        # Buffer locally as fallback; the deque drops the oldest event itself
+        self._local_buffer.append(event)
+        
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Audit events are never dropped; wait for the writer instead
+            self.backpressure_waits += 1
+            logger.warning("Audit queue full, waiting for writer", queued=self._queue.qsize())
+            await self._queue.put(event)
+    
+    async def _drain(self):
+        """Collect queued events into batches and write each batch once"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            event = await self._queue.get()
+            if event is None:
+                break
+            
+            batch = [event]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+            
+            await self._store_events(batch)
+    
+    async def _store_events(self, events: List[AuditEvent]):
+        """Store a batch of events in configured backends"""
+        
+        # Add event hash for integrity, off the callers' path
+        for event in events:
+            event.details["event_hash"] = event.generate_event_hash()
+            event._search_blob = None  # Details changed; rebuild on next search
         
         # Store in Redis for fast access
         if self.redis_client:
-            await self._store_in_redis(event)
+            await self._store_in_redis(events)
         
         # Store in database for long-term retention
         if self.db_session:
-            await self._store_in_database(event)
-        
-        # Buffer locally as fallback
-        self._local_buffer.append(event)
-        if len(self._local_buffer) > self._buffer_size:
-            self._local_buffer = self._local_buffer[-self._buffer_size:]
+            await self._store_in_database(events)
     
-    async def _store_in_redis(self, event: AuditEvent):
-        """Store event in Redis"""
+    async def _store_in_redis(self, events: List[AuditEvent]):
+        """Store events in Redis"""
         try:
-            # Store event details
-            event_key = f"audit:event:{event.id}"
-            await self.redis_client.hset(
-                event_key,
-                mapping={
-                    "event_data": event.json(),
-                    "timestamp": event.timestamp.isoformat(),
-                    "event_type": event.event_type.value,
-                    "user_id": event.user_id or "",
-                    "severity": event.severity.value
-                }
-            )
-            await self.redis_client.expire(event_key, 86400 * 90)  # 90 days retention
-            
-            # Add to time-series index
-            date_key = f"audit:by_date:{event.timestamp.strftime('%Y%m%d')}"
-            await self.redis_client.zadd(
-                date_key, 
-                {event.id: event.timestamp.timestamp()}
-            )
-            await self.redis_client.expire(date_key, 86400 * 90)
-            
-            # Add to user index if applicable
-            if event.user_id:
-                user_key = f"audit:by_user:{event.user_id}"
-                await self.redis_client.zadd(
-                    user_key,
-                    {event.id: event.timestamp.timestamp()}
-                )
-                await self.redis_client.expire(user_key, 86400 * 90)
-            
-            # Add to event type index
-            type_key = f"audit:by_type:{event.event_type.value}"
-            await self.redis_client.zadd(
-                type_key,
-                {event.id: event.timestamp.timestamp()}
-            )
-            await self.redis_client.expire(type_key, 86400 * 90)
+            # All writes for the batch go out in a single round trip
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for event in events:
+                    self._queue_redis_writes(pipe, event)
+                await pipe.execute()
             
         except Exception as e:
-            logger.error("Failed to store audit event in Redis", 
-                        event_id=event.id, error=str(e))
+            logger.error("Failed to store audit events in Redis", 
+                        event_ids=[event.id for event in events], error=str(e))
+    
+    def _queue_redis_writes(self, pipe, event: AuditEvent):
+        """Queue the event hash and its index entries on a Redis pipeline"""
+        # Store event details
+        event_key = f"audit:event:{event.id}"
+        pipe.hset(
+            event_key,
+            mapping={
+                "event_data": event.model_dump_json(),
+                "timestamp": event.timestamp.isoformat(),
+                "event_type": event.event_type.value,
+                "user_id": event.user_id or "",
+                "severity": event.severity.value
+            }
+        )
+        pipe.expire(event_key, 86400 * 90)  # 90 days retention
+        
+        score = {event.id: event.timestamp.timestamp()}
+        
+        # Add to time-series index
+        date_key = f"audit:by_date:{event.timestamp.strftime('%Y%m%d')}"
+        pipe.zadd(date_key, score)
+        pipe.expire(date_key, 86400 * 90)
+        
+        # Add to user index if applicable
+        if event.user_id:
+            user_key = f"audit:by_user:{event.user_id}"
+            pipe.zadd(user_key, score)
+            pipe.expire(user_key, 86400 * 90)
+        
+        # Add to event type index
+        type_key = f"audit:by_type:{event.event_type.value}"
+        pipe.zadd(type_key, score)
+        pipe.expire(type_key, 86400 * 90)
     
-    async def _store_in_database(self, event: AuditEvent):
-        """Store event in database"""
+    async def _store_in_database(self, events: List[AuditEvent]):
+        """Store events in database"""
         try:
-            # In a real implementation, you'd have a proper audit_logs table
-            # This is a simplified example
-            
-            insert_stmt = text("""
-                INSERT INTO audit_logs (
-                    id, timestamp, event_type, severity, outcome,
-                    user_id, session_id, request_id, client_ip,
-                    description, details, region, event_hash
-                ) VALUES (
-                    :id, :timestamp, :event_type, :severity, :outcome,
-                    :user_id, :session_id, :request_id, :client_ip,
-                    :description, :details, :region, :event_hash
-                )
-            """)
-            
-            await self.db_session.execute(insert_stmt, {
-                "id": event.id,
-                "timestamp": event.timestamp,
-                "event_type": event.event_type.value,
-                "severity": event.severity.value,
-                "outcome": event.outcome.value,
-                "user_id": event.user_id,
-                "session_id": event.session_id,
-                "request_id": event.request_id,
-                "client_ip": event.client_ip,
-                "description": event.description,
-                "details": json.dumps(event.details),
-                "region": event.region,
-                "event_hash": event.details.get("event_hash")
-            })
+            # One executemany and one commit for the whole batch; SQLAlchemy
+            # sends the rows as multi-row INSERTs rather than one per event
+            await self.db_session.execute(audit_logs_table.insert(), [
+                {
+                    "id": event.id,
+                    "timestamp": event.timestamp,
+                    "event_type": event.event_type.value,
+                    "severity": event.severity.value,
+                    "outcome": event.outcome.value,
+                    "user_id": event.user_id,
+                    "session_id": event.session_id,
+                    "request_id": event.request_id,
+                    "client_ip": event.client_ip,
+                    "description": event.description,
+                    "details": orjson.dumps(event.details).decode(),
+                    "region": event.region,
+                    "event_hash": event.details.get("event_hash")
+                }
+                for event in events
+            ])
             
             await self.db_session.commit()
             
         except Exception as e:
-            logger.error("Failed to store audit event in database",
-                        event_id=event.id, error=str(e))
+            logger.error("Failed to store audit events in database",
+                        event_ids=[event.id for event in events], error=str(e))
             if self.db_session:
                 await self.db_session.rollback()
     
@@ -397,11 +510,10 @@ class AuditLogger:
             
             # Send to alerting system (Slack, email, webhook, etc.)
             if self.redis_client:
-                await self.redis_client.lpush(
-                    "security:critical_alerts",
-                    json.dumps(alert_data)
-                )
-                await self.redis_client.expire("security:critical_alerts", 86400 * 7)
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.lpush("security:critical_alerts", orjson.dumps(alert_data))
+                    pipe.expire("security:critical_alerts", 86400 * 7)
+                    await pipe.execute()
             
             # Log critical event
             logger.critical("Critical audit event", **alert_data)
@@ -415,8 +527,10 @@ class AuditLogger:
         try:
             if self.redis_client:
                 corr_key = f"audit:correlation:{correlation_id}"
-                await self.redis_client.sadd(corr_key, event_id)
-                await self.redis_client.expire(corr_key, 86400 * 30)
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.sadd(corr_key, event_id)
+                    pipe.expire(corr_key, 86400 * 30)
+                    await pipe.execute()
             
             # Local correlation tracking
             if correlation_id not in self._correlations:
@@ -448,32 +562,45 @@ class AuditLogger:
     
     async def _search_redis_events(self, filters: AuditFilter) -> List[AuditEvent]:
         """Search events in Redis"""
-        event_ids = set()
-        
-        # Time-based search
-        if filters.start_time or filters.end_time:
-            start_ts = filters.start_time.timestamp() if filters.start_time else 0
-            end_ts = filters.end_time.timestamp() if filters.end_time else float('inf')
+        date_keys: List[str] = []
+        user_keys = [f"audit:by_user:{user_id}" for user_id in filters.user_ids or ()]
+        type_keys = [f"audit:by_type:{event_type.value}" for event_type in filters.event_types or ()]
+        
+        # Index reads for every day, user and type are sent in one round trip
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            # Time-based search
+            if filters.start_time or filters.end_time:
+                start_ts = filters.start_time.timestamp() if filters.start_time else 0
+                end_ts = filters.end_time.timestamp() if filters.end_time else float('inf')
+                
+                # Search by date ranges
+                start_date = (filters.start_time or datetime.utcnow() - timedelta(days=30)).date()
+                end_date = (filters.end_time or datetime.utcnow()).date()
+                
+                current_date = start_date
+                while current_date <= end_date:
+                    date_key = f"audit:by_date:{current_date.strftime('%Y%m%d')}"
+                    date_keys.append(date_key)
+                    pipe.zrangebyscore(date_key, start_ts, end_ts)
+                    current_date += timedelta(days=1)
             
-            # Search by date ranges
-            start_date = (filters.start_time or datetime.utcnow() - timedelta(days=30)).date()
-            end_date = (filters.end_time or datetime.utcnow()).date()
+            for key in user_keys + type_keys:
+                pipe.zrange(key, 0, -1)
             
-            current_date = start_date
-            while current_date <= end_date:
-                date_key = f"audit:by_date:{current_date.strftime('%Y%m%d')}"
-                day_event_ids = await self.redis_client.zrangebyscore(
-                    date_key, start_ts, end_ts
-                )
-                event_ids.update(day_event_ids)
-                current_date += timedelta(days=1)
+            results = await pipe.execute() if date_keys or user_keys or type_keys else []
+        
+        date_results = results[:len(date_keys)]
+        user_results = results[len(date_keys):len(date_keys) + len(user_keys)]
+        type_results = results[len(date_keys) + len(user_keys):]
+        
+        event_ids = set()
+        for day_event_ids in date_results:
+            event_ids.update(day_event_ids)
         
         # Filter by user
-        if filters.user_ids:
+        if user_keys:
             user_event_ids = set()
-            for user_id in filters.user_ids:
-                user_key = f"audit:by_user:{user_id}"
-                user_events = await self.redis_client.zrange(user_key, 0, -1)
+            for user_events in user_results:
                 user_event_ids.update(user_events)
             
             if event_ids:
@@ -482,11 +609,9 @@ class AuditLogger:
                 event_ids = user_event_ids
         
         # Filter by event type
-        if filters.event_types:
+        if type_keys:
             type_event_ids = set()
-            for event_type in filters.event_types:
-                type_key = f"audit:by_type:{event_type.value}"
-                type_events = await self.redis_client.zrange(type_key, 0, -1)
+            for type_events in type_results:
                 type_event_ids.update(type_events)
             
             if event_ids:
@@ -494,14 +619,13 @@ class AuditLogger:
             else:
                 event_ids = type_event_ids
         
-        # Get event details
+        # Get event details for the page in one round trip
+        page_ids = list(event_ids)[filters.offset:filters.offset + filters.limit]
         events = []
-        for event_id in list(event_ids)[filters.offset:filters.offset + filters.limit]:
-            event_key = f"audit:event:{event_id}"
-            event_data = await self.redis_client.hget(event_key, "event_data")
+        for event_id, event_data in zip(page_ids, await self._fetch_event_data(page_ids)):
             if event_data:
                 try:
-                    event = AuditEvent.parse_raw(event_data)
+                    event = AuditEvent.model_validate_json(event_data)
                     
                     # Apply additional filters
                     if self._matches_filters(event, filters):
@@ -512,6 +636,15 @@ class AuditLogger:
         
         return sorted(events, key=lambda x: x.timestamp, reverse=True)
     
+    async def _fetch_event_data(self, event_ids: List[str]) -> List[Optional[str]]:
+        """Read the stored payloads for the given event ids in one round trip"""
+        if not event_ids:
+            return []
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for event_id in event_ids:
+                pipe.hget(f"audit:event:{event_id}", "event_data")
+            return await pipe.execute()
+    
     async def _search_database_events(self, filters: AuditFilter) -> List[AuditEvent]:
         """Search events in database"""
         # Simplified database search example
@@ -555,7 +688,7 @@ class AuditLogger:
                     request_id=row.request_id,
                     client_ip=row.client_ip,
                     description=row.description,
-                    details=json.loads(row.details or "{}"),
+                    details=orjson.loads(row.details or "{}"),
                     region=row.region
                 )
                 events.append(event)
@@ -566,17 +699,13 @@ class AuditLogger:
     
     async def _search_local_events(self, filters: AuditFilter) -> List[AuditEvent]:
         """Search events in local buffer"""
-        events = []
+        matches = (event for event in self._local_buffer if self._matches_filters(event, filters))
         
-        for event in self._local_buffer:
-            if self._matches_filters(event, filters):
-                events.append(event)
-        
-        # Sort by timestamp (newest first)
-        events.sort(key=lambda x: x.timestamp, reverse=True)
+        # Newest first; only the events up to the end of the requested page are ordered
+        events = heapq.nlargest(filters.offset + filters.limit, matches, key=lambda x: x.timestamp)
         
         # Apply pagination
-        return events[filters.offset:filters.offset + filters.limit]
+        return events[filters.offset:]
     
     def _matches_filters(self, event: AuditEvent, filters: AuditFilter) -> bool:
         """Check if event matches filter criteria"""
@@ -608,11 +737,8 @@ class AuditLogger:
         if filters.correlation_id and event.correlation_id != filters.correlation_id:
             return False
         
-        if filters.search_text:
-            search_text = filters.search_text.lower()
-            if (search_text not in event.description.lower() and
-                search_text not in str(event.details).lower()):
-                return False
+        if filters.search_text and filters.search_needle not in event.search_blob():
+            return False
         
         return True
     
@@ -629,13 +755,11 @@ class AuditLogger:
             
             # Get event details
             events = []
-            for event_id in event_ids:
-                if self.redis_client:
-                    event_key = f"audit:event:{event_id}"
-                    event_data = await self.redis_client.hget(event_key, "event_data")
+            if self.redis_client:
+                for event_data in await self._fetch_event_data(list(event_ids)):
                     if event_data:
                         try:
-                            event = AuditEvent.parse_raw(event_data)
+                            event = AuditEvent.model_validate_json(event_data)
                             events.append(event)
                         except Exception:
                             continue
@@ -701,7 +825,7 @@ class AuditLogger:
                 
                 # Add event details based on format
                 if config.format == "json":
-                    report["events"].append(event.dict())
+                    report["events"].append(event.model_dump())
                 elif config.format == "csv":
                     # Simplified CSV format
                     report["events"].append({
@@ -6,7 +6,7 @@ Orchestrates communication between React frontend and backend services.
 
 import asyncio
 import json
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Callable, Awaitable, Tuple
 from datetime import datetime, timedelta
 import structlog
 from fastapi import Request, Response, HTTPException, WebSocket, WebSocketDisconnect
@@ -28,6 +28,18 @@ logger = structlog.get_logger(__name__)
 settings = get_settings()
 
 
+# Read-only operations whose result depends only on region and request data,
+# so identical requests in one batch can share a single downstream call
+COALESCABLE_OPERATIONS = frozenset({
+    ("trading", "get_market_data"),
+    ("compliance", "get_regulations"),
+})
+
+
+# Seconds a single WebSocket send may take before the client is dropped as stalled
+WS_SEND_TIMEOUT = 5.0
+
+
 class BFFRequest(BaseModel):
     """Request model for BFF operations"""
     service: str = Field(..., description="Target service (trading, risk, compliance, iot)")
@@ -79,24 +91,32 @@ class WebSocketManager:
     async def send_to_user(self, user_id: str, message: Dict[str, Any]):
         """Send message to all user's WebSocket connections"""
         if user_id in self.connections:
-            disconnected = []
-            for websocket in self.connections[user_id]:
-                try:
-                    await websocket.send_text(json.dumps(message))
-                except Exception as e:
-                    logger.warning("Failed to send WebSocket message", 
-                                 user_id=user_id, error=str(e))
-                    disconnected.append(websocket)
-            
-            # Clean up disconnected websockets
-            for websocket in disconnected:
-                self.disconnect(websocket, user_id)
+            await self._send_frame(user_id, json.dumps(message))
     
     async def broadcast(self, message: Dict[str, Any], user_filter: Optional[callable] = None):
         """Broadcast message to all or filtered connections"""
-        for user_id in list(self.connections.keys()):
-            if user_filter is None or user_filter(user_id):
-                await self.send_to_user(user_id, message)
+        # Serialize once and fan out to all recipients concurrently
+        frame = json.dumps(message)
+        await asyncio.gather(*(
+            self._send_frame(user_id, frame)
+            for user_id in list(self.connections.keys())
+            if user_filter is None or user_filter(user_id)
+        ))
+    
+    async def _send_frame(self, user_id: str, frame: str):
+        """Send a serialized frame to every connection of a user concurrently"""
+        websockets = list(self.connections.get(user_id, ()))
+        results = await asyncio.gather(
+            *(asyncio.wait_for(websocket.send_text(frame), WS_SEND_TIMEOUT) for websocket in websockets),
+            return_exceptions=True
+        )
+        
+        # Clean up disconnected or stalled websockets
+        for websocket, result in zip(websockets, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to send WebSocket message", 
+                             user_id=user_id, error=str(result) or type(result).__name__)
+                self.disconnect(websocket, user_id)
 
 
 class QenergyZBFF:
@@ -141,6 +161,7 @@ class QenergyZBFF:
     
     async def shutdown(self):
         """Cleanup resources"""
+        await self.audit_logger.shutdown()
         if self.redis_client:
             await self.redis_client.close()
         logger.info("BFF service shut down")
@@ -180,12 +201,17 @@ class QenergyZBFF:
                 timestamp=end_time
             )
     
-    async def process_request(self, request: BFFRequest) -> BFFResponse:
+    async def process_request(
+        self,
+        request: BFFRequest,
+        route: Optional[Callable[[BFFRequest], Awaitable[Dict[str, Any]]]] = None
+    ) -> BFFResponse:
         """
         Process BFF request with service orchestration
         
         Args:
             request: BFF request object
+            route: Optional replacement for the downstream service call
             
         Returns:
             BFF response object
@@ -209,7 +235,7 @@ class QenergyZBFF:
                     )
                 
                 # Route request to appropriate service
-                result = await self._route_request(request)
+                result = await (route or self._route_request)(request)
                 
                 # Cache successful response if configured
                 if settings.enable_response_caching:
@@ -246,6 +272,45 @@ class QenergyZBFF:
                     request_id=request_id
                 )
     
+    async def process_batch(self, requests: List[BFFRequest]) -> List[Union[BFFResponse, Exception]]:
+        """
+        Process a batch of BFF requests concurrently
+        
+        Each request still gets its own rate limiting, audit trail and circuit
+        breaker accounting. Identical read-only requests share one downstream
+        call, started by whichever of them is routed first.
+        
+        Args:
+            requests: BFF requests collected by the micro-batcher
+            
+        Returns:
+            One response or exception per request, in order
+        """
+        shared_calls: Dict[Tuple[str, ...], asyncio.Future] = {}
+        
+        def shared_route(key: Tuple[str, ...]):
+            async def route(request: BFFRequest) -> Dict[str, Any]:
+                call = shared_calls.get(key)
+                if call is None:
+                    call = shared_calls[key] = asyncio.ensure_future(self._route_request(request))
+                return await asyncio.shield(call)
+            return route
+        
+        tasks = []
+        for request in requests:
+            route = None
+            if (request.service, request.operation) in COALESCABLE_OPERATIONS:
+                key = (
+                    request.service,
+                    request.operation,
+                    request.region,
+                    json.dumps(request.data, sort_keys=True, default=str)
+                )
+                route = shared_route(key)
+            tasks.append(self.process_request(request, route=route))
+        
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
     async def _route_request(self, request: BFFRequest) -> Dict[str, Any]:
         """Route request to appropriate service"""
         if request.service == "trading":
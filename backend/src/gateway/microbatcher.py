@@ -0,0 +1,111 @@
+"""
+Micro-batcher for BFF Requests
+
+Buffers incoming BFF requests for a few milliseconds so they can be
+processed together, letting the BFF share downstream calls between
+requests that ask for the same data.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Set
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class PendingBFFRequest:
+    """A queued BFF request and the future its caller is waiting on"""
+    request: Any
+    future: asyncio.Future
+
+
+class MicroBatcher:
+    """
+    Collects requests into small batches for a batch processor
+
+    A batch is flushed when it reaches ``max_batch_size`` requests or when
+    ``max_wait_ms`` has passed since its first request arrived. The processor
+    receives the batched requests in order and must return one result per
+    request; exceptions in that list are raised to the matching caller.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 10000
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    def start(self):
+        """Start the batching loop if it is not running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """Process queued requests and stop the batching loop"""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def submit(self, request: Any) -> Any:
+        """Queue a request and wait for its result"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(PendingBFFRequest(request=request, future=future))
+        return await future
+
+    async def _run_loop(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            pending = await self._queue.get()
+            if pending is None:
+                break
+
+            batch = [pending]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if pending is None:
+                    stopping = True
+                    break
+                batch.append(pending)
+
+            # Batches run concurrently so a slow one does not hold up the next
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[PendingBFFRequest]):
+        try:
+            results = await self.process_batch([pending.request for pending in batch])
+        except Exception as e:
+            logger.error("BFF batch processing failed", batch_size=len(batch), error=str(e))
+            results = [e] * len(batch)
+
+        for pending, result in zip(batch, results):
+            if pending.future.done():
+                continue  # Caller went away
+            if isinstance(result, BaseException):
+                pending.future.set_exception(result)
+            else:
+                pending.future.set_result(result)
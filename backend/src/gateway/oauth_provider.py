@@ -11,14 +11,17 @@ Supports multiple OAuth providers:
 import asyncio
 import secrets
 import base64
+import calendar
 import hashlib
 import json
+import time
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 from enum import Enum
 import structlog
 import httpx
 import jwt
+import redis.asyncio as aioredis
 from pydantic import BaseModel, Field, HttpUrl, EmailStr
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -129,6 +132,81 @@ class OAuthError(Exception):
         super().__init__(message)
 
 
+class OAuthTokenStore:
+    """
+    Redis-backed store of issued OAuth tokens
+    
+    Tokens are kept in a hash per (user, provider) with a TTL of the token
+    lifetime, and indexed in a sorted set by expiry time so tokens nearing
+    expiry can be found without scanning the keyspace.
+    """
+    
+    KEY_PREFIX = "oauth:token:"
+    EXPIRY_INDEX = "oauth:token:expiry"
+    # Lifetime assumed for tokens stored before their lifetime was recorded
+    DEFAULT_EXPIRES_IN = 3600
+    
+    def __init__(self, redis_client: aioredis.Redis):
+        self.redis = redis_client
+    
+    @staticmethod
+    def _member(user_id: str, provider: OAuthProvider) -> str:
+        return f"{user_id}:{provider.value}"
+    
+    async def save(self, user_id: str, token: OAuthToken):
+        """Store a token that can be refreshed ahead of its expiry"""
+        if not token.refresh_token or not token.expires_in:
+            return
+        
+        member = self._member(user_id, token.provider)
+        expires_at = calendar.timegm(token.created_at.utctimetuple()) + token.expires_in
+        
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(f"{self.KEY_PREFIX}{member}", mapping={
+                "access_token": token.access_token,
+                "refresh_token": token.refresh_token,
+                "token_type": token.token_type,
+                "scope": token.scope or "",
+                "expires_in": token.expires_in,
+                "expires_at": expires_at
+            })
+            pipe.expire(f"{self.KEY_PREFIX}{member}", token.expires_in)
+            pipe.zadd(self.EXPIRY_INDEX, {member: expires_at})
+            await pipe.execute()
+    
+    async def remove(self, user_id: str, provider: OAuthProvider):
+        """Forget a stored token"""
+        member = self._member(user_id, provider)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(f"{self.KEY_PREFIX}{member}")
+            pipe.zrem(self.EXPIRY_INDEX, member)
+            await pipe.execute()
+    
+    async def expiring_within(self, seconds: float) -> List[tuple]:
+        """Return (user_id, provider, refresh_token, expires_in) for tokens expiring soon"""
+        members = await self.redis.zrangebyscore(self.EXPIRY_INDEX, "-inf", time.time() + seconds)
+        if not members:
+            return []
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for member in members:
+                pipe.hmget(f"{self.KEY_PREFIX}{member}", "refresh_token", "expires_in")
+            stored = await pipe.execute()
+        
+        due, stale = [], []
+        for member, (refresh_token, expires_in) in zip(members, stored):
+            if refresh_token is None:
+                stale.append(member)  # Hash already expired
+                continue
+            user_id, provider = member.rsplit(":", 1)
+            expires_in = int(expires_in) if expires_in else self.DEFAULT_EXPIRES_IN
+            due.append((user_id, OAuthProvider(provider), refresh_token, expires_in))
+        
+        if stale:
+            await self.redis.zrem(self.EXPIRY_INDEX, *stale)
+        return due
+
+
 class OAuthProviderHandler:
     """
     OAuth Provider Integration Handler
@@ -140,7 +218,15 @@ class OAuthProviderHandler:
     def __init__(self):
         self.providers: Dict[OAuthProvider, OAuthConfig] = {}
         self.states: Dict[str, OAuthState] = {}  # In production, use Redis
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        # One pooled client for all provider calls, so TLS sessions are kept alive
+        self.http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=settings.oauth_http_max_connections,
+                max_keepalive_connections=settings.oauth_http_max_connections,
+                keepalive_expiry=settings.oauth_http_keepalive_expiry
+            )
+        )
         
         # Load provider configurations
         self._load_provider_configs()
@@ -638,6 +724,37 @@ class OAuthProviderHandler:
             logger.error("OAuth token revocation failed", provider=provider, error=str(e))
             return False
     
+    async def refresh_expiring_tokens(self, token_store: OAuthTokenStore, within: float = 300) -> int:
+        """
+        Refresh stored tokens that expire within the given window
+        
+        Args:
+            token_store: Store holding issued tokens
+            within: Seconds before expiry at which tokens are refreshed
+            
+        Returns:
+            Number of tokens refreshed
+        """
+        refreshed = 0
+        for user_id, provider, refresh_token, expires_in in await token_store.expiring_within(within):
+            try:
+                oauth_token = await self.refresh_token(provider, refresh_token)
+            except OAuthError as e:
+                # Left in place; retried on the next pass until the token expires
+                logger.warning("Background OAuth token refresh failed",
+                             provider=provider, user_id=user_id, error=str(e))
+                continue
+            
+            # Providers may omit expires_in on refresh; keep the previous lifetime
+            if not oauth_token.expires_in:
+                oauth_token.expires_in = expires_in
+            await token_store.save(user_id, oauth_token)
+            refreshed += 1
+        
+        if refreshed:
+            logger.info("Refreshed expiring OAuth tokens", count=refreshed)
+        return refreshed
+    
     def get_supported_providers(self) -> List[OAuthProvider]:
         """Get list of configured OAuth providers"""
         return list(self.providers.keys())
@@ -230,7 +230,7 @@ async def general_exception_handler(request: Request, exc: Exception):
         error_type=type(exc).__name__,
         url=str(request.url),
         method=request.method,
-        exc_info=True
+        exc_info=exc
     )
     return JSONResponse(
         status_code=500,
@@ -27,7 +27,7 @@ elif [ "$API_VERSION" = "v2" ]; then
     alembic upgrade head || echo "Warning: Migration failed, continuing..."
     
     # Start the new API
-    uvicorn api.main:app --host 0.0.0.0 --port 8000 --reload
+    uvicorn api.main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --reload
 else
     echo "Invalid API_VERSION. Use 'v1' or 'v2'"
     exit 1
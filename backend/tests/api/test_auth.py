@@ -151,6 +151,20 @@ class TestAuthenticationAPI:
         assert PasswordHandler.verify_password(password, hashed)
         assert not PasswordHandler.verify_password("wrongpassword", hashed)
 
+    @pytest.mark.asyncio
+    async def test_password_hashing_off_event_loop(self):
+        """Test threaded password helpers and the rejected-attempt cache"""
+        from api.dependencies.auth import FailedPasswordCache
+
+        hashed = await PasswordHandler.hash_password_async("SecurePassword123!")
+        assert await PasswordHandler.verify_password_async("SecurePassword123!", hashed)
+        assert not await PasswordHandler.verify_password_async("wrongpassword", hashed)
+
+        cache = FailedPasswordCache(ttl=5.0)
+        cache.add("test@example.com", "wrongpassword", hashed)
+        assert cache.contains("TEST@example.com", "wrongpassword", hashed)
+        assert not cache.contains("test@example.com", "SecurePassword123!", hashed)
+
 
 class TestAuthenticationDependencies:
     """Test authentication dependencies and utilities"""
@@ -176,4 +190,46 @@ class TestAuthenticationDependencies:
         # Validate token
         token_data = JWTHandler.verify_token(token)
         assert token_data.user_id == "user123"
-        assert token_data.type == "access"
\ No newline at end of file
+        assert token_data.type == "access"
+    
+    def test_jwt_verification_cache(self):
+        """Test repeat verifications are served from the token cache"""
+        from api.dependencies.auth import JWTHandler, token_cache
+        
+        token = JWTHandler.create_access_token({"sub": "user123"})
+        first = JWTHandler.verify_token(token)
+        assert JWTHandler.verify_token(token) is first
+        
+        assert JWTHandler.get_cached_claims(token)["sub"] == "user123"
+        
+        # Revoked tokens are re-verified on next use
+        JWTHandler.revoke_token(token)
+        assert token_cache.get(token) is None
+        assert JWTHandler.get_cached_claims(token) is None
+        assert JWTHandler.verify_token(token) is not first
+    
+    def test_rate_limit_identifier_uses_token_cache(self, monkeypatch):
+        """Test rate limit identification reuses cached token verification"""
+        import jwt
+        from starlette.requests import Request
+        from api.dependencies.auth import JWTHandler
+        from api.dependencies.rate_limiting import get_user_id_for_rate_limiting
+        
+        token = JWTHandler.create_access_token({"sub": "user123"})
+        JWTHandler.verify_token(token)
+        
+        def fail_decode(*args, **kwargs):
+            raise AssertionError("token should be served from the cache")
+        monkeypatch.setattr(jwt, "decode", fail_decode)
+        
+        request = Request({
+            "type": "http",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+            "client": ("127.0.0.1", 1234),
+        })
+        assert get_user_id_for_rate_limiting(request) == "user:user123"
+        
+        # Chained limiters reuse the identifier stored on the request
+        JWTHandler.revoke_token(token)
+        assert request.state.rl_identifier == "user:user123"
+        assert get_user_id_for_rate_limiting(request) == "user:user123"
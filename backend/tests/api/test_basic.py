@@ -8,6 +8,22 @@ import pytest
 from fastapi.testclient import TestClient
 
 
+def disable_rate_limits(app):
+    """Override the Redis-backed rate limit dependencies"""
+    from api.dependencies.rate_limiting import (
+        auth_rate_limit,
+        api_rate_limit,
+        trading_rate_limit,
+        admin_rate_limit
+    )
+    
+    async def no_rate_limit():
+        return None
+    
+    for limit in (auth_rate_limit, api_rate_limit, trading_rate_limit, admin_rate_limit):
+        app.dependency_overrides[limit] = no_rate_limit
+
+
 def test_health_endpoint():
     """Test basic health endpoint without database"""
     from api.main import create_app
@@ -17,7 +33,6 @@ def test_health_endpoint():
     client = TestClient(app)
     
     # Override dependencies to skip database and Redis
-    from api.dependencies.rate_limiting import limiter
     from api.dependencies.database import get_db
     
     # Mock database dependency
@@ -27,7 +42,7 @@ def test_health_endpoint():
     app.dependency_overrides[get_db] = mock_get_db
     
     # Disable rate limiting
-    app.state.limiter = None
+    disable_rate_limits(app)
     
     # Test health endpoint
     response = client.get("/health")
@@ -52,7 +67,7 @@ def test_openapi_documentation():
         yield None
     
     app.dependency_overrides[get_db] = mock_get_db
-    app.state.limiter = None
+    disable_rate_limits(app)
     
     # Test OpenAPI endpoint
     response = client.get("/api/openapi.json")
@@ -79,7 +94,7 @@ def test_cors_headers():
         yield None
     
     app.dependency_overrides[get_db] = mock_get_db
-    app.state.limiter = None
+    disable_rate_limits(app)
     
     # Make an OPTIONS request to test CORS
     response = client.options("/health", headers={"Origin": "http://localhost:3000"})
@@ -124,6 +139,9 @@ def test_input_sanitization():
     assert "&lt;script&gt;" in clean_text or "script" not in clean_text
     assert "Normal text" in clean_text
     
+    # Removing one injection token must not leave another one behind
+    assert InputSanitizer.sanitize_text("onjavascript:click=alert(1)") == "alert(1)"
+    
     # Test email validation
     assert InputSanitizer.validate_email("test@example.com") is True
     assert InputSanitizer.validate_email("invalid-email") is False